@@ -39,7 +39,8 @@ Module.register('MMM-Face-Reco-DNN', {
     contrast: 0,
     // Rotate camera image (-1 = no rotation, 0 = 90°, 1 = 180°, 2 = 270°)
     rotateCamera: -1,
-    // method of face recognition (dnn = deep neural network, haar = haarcascade)
+    // method of face recognition (dnn = deep neural network, haar = haarcascade,
+    // cascade = haarcascade which only runs detectionMethod around the faces it found)
     method: 'dnn',
     // which face detection model to use. "hog" is less accurate but faster on CPUs. "cnn" is a more accurate
     // deep-learning model which is GPU/CUDA accelerated (if available). The default is "hog".
@@ -77,6 +78,55 @@ Module.register('MMM-Face-Reco-DNN', {
     // exmaple with with MMM-Pir with notification name 'MMM_PIR-SCREEN_POWERSTATUS' to only run face 
     // recognition when screen is on.
     external_trigger_notification: '',
+    // Skip face detection while nothing moves in front of the mirror, sensitivity 1-100 (0 = off)
+    motionGate: 0,
+    // Interval in ms between recognitions while something moves (only with motionGate)
+    motionCheckInterval: 500,
+    // Adapt checkInterval and processWidth at runtime: fast and detailed while faces are in front of the mirror,
+    // slowing down while nobody is there. The bounds are [minimum, maximum]
+    adaptive: false,
+    checkIntervalBounds: [500, 8000],
+    processWidthBounds: [320, 800],
+    // Log the latency of every recognition stage every x seconds (0 = off)
+    metricsInterval: 0,
+    // Detect faces on the image with processWidth, but compute the encodings on crops of the full resolution image.
+    // Better recognition of distant faces at the same CPU usage, or the same recognition with a smaller processWidth
+    encodeFullResolution: false,
+    // Width of the image shown with outputmm (0 = processWidth)
+    previewWidth: 0,
+    // JPEG quality of the image shown with outputmm (0-100)
+    previewQuality: 80,
+    // Maximum number of images per second shown with outputmm (0 = unlimited)
+    previewFps: 5,
+    // File the image shown with outputmm is exchanged through, which keeps it out of the JSON messages
+    // ('' = send it within the JSON messages)
+    previewFile: '/dev/shm/mmm-face-reco-dnn.jpg',
+    // Maximum number of pictures saved per person with extendDataset, the oldest are deleted first (0 = unlimited)
+    maxSnapshots: 0,
+    // Minimum seconds between two pictures of the same person saved with extendDataset
+    snapshotInterval: 60,
+    // Use several cameras in one recognition process, e.g. [{ name: 'left', source: 'picamera:0' }, { name: 'right', source: 'picamera:1', rotateCamera: 1 }].
+    // Every camera can set source, resolution, rotateCamera, brightness, contrast and priority, everything else is shared. Empty means one camera
+    cameras: [],
+    // Order in which the frames of several cameras are processed: 'roundrobin' or 'priority' (a camera with priority p
+    // is processed p + 1 times as often as one with priority 0, every camera still gets its turn)
+    cameraSchedule: 'roundrobin',
+    // Number of frames (e.g. of several cameras) which are detected together with detectionMethod 'cnn'
+    detectionBatchSize: 1,
+    // Maximum ms to wait for frames to fill a detection batch
+    detectionBatchWait: 50,
+    // With external_trigger_notification, load everything on startup but keep the camera off until the first trigger
+    startInStandby: false,
+    // Search faces around where they were in the last frame first, at about roiFaceSize pixels per face. The whole
+    // image is still searched every roiFullScan frames and whenever a face was not found there
+    roiDetection: false,
+    roiFaceSize: 120,
+    roiFullScan: 10,
+    // Log in a person after being recognized in presenceEnterFrames of the last presenceWindow frames, and log them out
+    // after presenceExitFrames frames in a row without them. Higher values ignore single misrecognized frames
+    presenceEnterFrames: 1,
+    presenceWindow: 1,
+    presenceExitFrames: 1,
   },
 
   timouts: {},
@@ -479,6 +529,11 @@ Module.register('MMM-Face-Reco-DNN', {
         notification === this.config.external_trigger_notification) {
       this.sendSocketNotification(notification, payload);
     }
+
+    // Settings of the recognition changed by another module
+    if (notification === 'FACE_RECO_SETTINGS') {
+      this.sendSocketNotification(notification, payload);
+    }
   },
 
   getDom: function () {
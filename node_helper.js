@@ -11,11 +11,15 @@
 
 const NodeHelper = require('node_helper');
 const { PythonShell } = require('python-shell');
+const fs = require('fs');
 const onExit = require('signal-exit');
 var pythonStarted = false;
+// Version of the messages from tools/recognition.py
+const PROTOCOL_VERSION = 2;
 
 module.exports = NodeHelper.create({
   pyshell: null,
+  previewPending: false,
   python_start: function () {
     const self = this;
     const extendedDataset = this.config.extendDataset ? 'True' : 'False';
@@ -40,6 +44,30 @@ module.exports = NodeHelper.create({
         '--resolution=' + this.config.resolution,
         '--processWidth=' + this.config.processWidth,
         '--run-only-on-notification=' + (this.config.external_trigger_notification !== '' ? '1' : '0'),
+        '--motionGate=' + this.config.motionGate,
+        '--motionInterval=' + this.config.motionCheckInterval,
+        '--adaptive=' + (this.config.adaptive ? 'True' : 'False'),
+        '--intervalBounds=' + this.config.checkIntervalBounds,
+        '--processWidthBounds=' + this.config.processWidthBounds,
+        '--metricsInterval=' + this.config.metricsInterval,
+        '--encodeFullResolution=' + (this.config.encodeFullResolution ? 'True' : 'False'),
+        '--previewWidth=' + this.config.previewWidth,
+        '--previewQuality=' + this.config.previewQuality,
+        '--previewFps=' + this.config.previewFps,
+        '--previewFile=' + this.config.previewFile,
+        '--maxSnapshots=' + this.config.maxSnapshots,
+        '--snapshotInterval=' + this.config.snapshotInterval,
+        '--cameras=' + JSON.stringify(this.config.cameras),
+        '--cameraSchedule=' + this.config.cameraSchedule,
+        '--batchSize=' + this.config.detectionBatchSize,
+        '--batchWait=' + this.config.detectionBatchWait,
+        '--standby=' + (this.config.startInStandby ? 'True' : 'False'),
+        '--roi=' + (this.config.roiDetection ? 'True' : 'False'),
+        '--roiFaceSize=' + this.config.roiFaceSize,
+        '--roiFullScan=' + this.config.roiFullScan,
+        '--presenceEnter=' + this.config.presenceEnterFrames,
+        '--presenceWindow=' + this.config.presenceWindow,
+        '--presenceExit=' + this.config.presenceExitFrames,
       ],
     };
 
@@ -51,34 +79,61 @@ module.exports = NodeHelper.create({
     self.pyshell = new PythonShell('modules/' + this.name + '/tools/recognition.py', options);
 
     // check if a message of the python script is comming in
+    self.lastSequence = 0;
     self.pyshell.on('message', function (message) {
+      // Every message is {v, seq, ts, kind, type, data}, see tools/utils/print.py
+      if (message.v !== PROTOCOL_VERSION) {
+        console.log('[' + self.name + '] unsupported message ' + JSON.stringify(message));
+        return;
+      }
+      if (message.seq !== self.lastSequence + 1) {
+        console.log('[' + self.name + '] ' + (message.seq - self.lastSequence - 1) + ' messages lost');
+      }
+      self.lastSequence = message.seq;
+      const data = message.data;
+
       // A status message has received and will log
-      if (Object.prototype.hasOwnProperty.call(message, 'status')) {
-        console.log('[' + self.name + '] ' + message.status);
+      if (message.kind === 'status') {
+        const status = typeof data === 'string' ? data : JSON.stringify(data);
+        console.log('[' + self.name + '] ' + status);
       }
 
-      // Somebody new are in front of the camera, send it back to the Magic Mirror Module
-      if (Object.prototype.hasOwnProperty.call(message, 'camera_image')) {
-        self.sendSocketNotification('camera_image', {
-          image: message.camera_image.image,
-        });
+      // Latency of the recognition stages, log it so it can be used for tuning
+      if (message.kind === 'metrics') {
+        console.log('[' + self.name + '] metrics ' + JSON.stringify(data));
       }
 
-      // Check if we get an image to show in the mirror
-      if (Object.prototype.hasOwnProperty.call(message, 'login')) {
-        console.log('[' + self.name + '] ' + 'Users ' + message.login.names.join(' - ') + ' logged in.');
-        self.sendSocketNotification('user', {
-          action: 'login',
-          users: message.login.names,
-        });
+      // Somebody new are in front of the camera, send it back to the Magic Mirror Module
+      if (message.kind === 'preview') {
+        if (data.file) {
+          // The image was written to a file, skip it if we are still busy with the last one
+          if (!self.previewPending) {
+            self.previewPending = true;
+            fs.readFile(data.file, function (err, image) {
+              self.previewPending = false;
+              if (!err) {
+                self.sendSocketNotification('camera_image', {
+                  image: image.toString('base64'),
+                });
+              }
+            });
+          }
+        } else {
+          self.sendSocketNotification('camera_image', {
+            image: data.image,
+          });
+        }
       }
 
-      // Somebody left the camera, send it back to the Magic Mirror Module
-      if (Object.prototype.hasOwnProperty.call(message, 'logout')) {
-        console.log('[' + self.name + '] ' + 'Users ' + message.logout.names.join(' - ') + ' logged out.');
+      // Somebody logged in or out, send it back to the Magic Mirror Module
+      if (message.kind === 'event') {
+        // time from capturing the frame until the event arrived here
+        const latency = message.captured ? ' (' + Math.round(Date.now() - message.captured * 1000) + ' ms)' : '';
+        const action = message.type === 'login' ? 'logged in' : 'logged out';
+        console.log('[' + self.name + '] ' + 'Users ' + data.names.join(' - ') + ' ' + action + '.' + latency);
         self.sendSocketNotification('user', {
-          action: 'logout',
-          users: message.logout.names,
+          action: message.type,
+          users: data.names,
         });
       }
     });
@@ -123,11 +178,16 @@ module.exports = NodeHelper.create({
     // if it has been started
     if (notification === this.config.external_trigger_notification && pythonStarted) {
       if (payload === true) {
-        this.send_python_cmd('start');
+        this.send_python_cmd({ command: 'start' });
       } else {
-        this.send_python_cmd('stop');
+        this.send_python_cmd({ command: 'stop' });
       }
     }
+
+    // Change interval, tolerance or processWidth without restarting python
+    if (notification === 'FACE_RECO_SETTINGS' && pythonStarted) {
+      this.send_python_cmd(Object.assign({ command: 'set' }, payload));
+    }
   },
 
   stop: function () {
@@ -0,0 +1,153 @@
+# import the necessary packages
+import face_recognition
+import json
+import multiprocessing
+import numpy
+import platform
+import resource
+import sys
+import time
+from utils.arguments import Arguments
+from utils.detector import Detector
+from utils.matcher import Matcher
+from utils.preprocess import Preprocessor
+from utils.source import ImageFolderSource
+from utils.store import EncodingStore
+
+# stages which are timed for every frame
+stages = ("preprocess", "detect", "encode", "match", "total")
+
+
+def peak_rss():
+    # peak resident memory of this process in MB, ru_maxrss is in bytes on
+    # macOS and in kilobytes everywhere else
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if platform.system() == "Darwin" else rss / 1024
+
+
+def summarize(values):
+    # latency percentiles in milliseconds
+    values = numpy.asarray(values) * 1000
+    return {
+        "mean": round(float(values.mean()), 2),
+        "p50": round(float(numpy.percentile(values, 50)), 2),
+        "p90": round(float(numpy.percentile(values, 90)), 2),
+        "p99": round(float(numpy.percentile(values, 99)), 2),
+        "max": round(float(values.max()), 2),
+    }
+
+
+def run(config):
+    # Benchmarks one method / process width combination. Runs in its own
+    # process, so the peak memory is not influenced by the other runs.
+    (method, processWidth, args) = config
+    if method == "haar":
+        detector = Detector("haar", cascade=args["cascade"])
+    elif method == "cascade":
+        detector = Detector("cascade", detectionMethod="hog", cascade=args["cascade"])
+    else:
+        detector = Detector("dnn", detectionMethod=method)
+
+    preprocessor = Preprocessor()
+    matcher = None
+    if args["encodings"]:
+        data = EncodingStore.load(args["encodings"])
+        matcher = Matcher(data.encodings, data.names)
+
+    # decode all images up front, reading is not part of the pipeline
+    source = ImageFolderSource(args["images"])
+    frames = []
+    while args["limit"] == 0 or len(frames) < args["limit"]:
+        frame = source.read()
+        if frame is None:
+            break
+        frames.append(frame)
+
+    timings = {stage: [] for stage in stages}
+    faces = 0
+    start = time.perf_counter()
+    for _ in range(args["repeat"]):
+        for originalFrame in frames:
+            times = [time.perf_counter()]
+
+            frame = preprocessor.process(originalFrame, width=processWidth)
+            times.append(time.perf_counter())
+
+            rgb, boxes = detector.detect(frame)
+            times.append(time.perf_counter())
+
+            encodings = face_recognition.face_encodings(rgb, boxes)
+            times.append(time.perf_counter())
+
+            if matcher is not None:
+                matcher.match(encodings, args["tolerance"])
+            times.append(time.perf_counter())
+
+            for i, stage in enumerate(stages[:-1]):
+                timings[stage].append(times[i + 1] - times[i])
+            timings["total"].append(times[-1] - times[0])
+            faces += len(boxes)
+    elapsed = time.perf_counter() - start
+
+    processed = len(frames) * args["repeat"]
+    result = {
+        "method": method,
+        "processWidth": processWidth,
+        "frames": processed,
+        "faces": faces,
+        "fps": round(processed / elapsed, 2) if elapsed > 0 else 0.0,
+        "latency": {stage: summarize(timings[stage]) for stage in stages},
+        "peakRssMb": round(peak_rss(), 1),
+    }
+    if method == "cascade":
+        # how often the expensive confirmation was skipped
+        result["cascade"] = detector.stats()
+    return result
+
+
+def main():
+    # construct the argument parser and parse the arguments
+    Arguments.prepareBenchmarkArguments()
+    args = dict(Arguments.args)
+
+    configs = [
+        (method, int(processWidth), args)
+        for method in Arguments.get("methods").split(",")
+        for processWidth in Arguments.get("processWidths").split(",")
+    ]
+
+    # every configuration in a fresh process
+    results = []
+    with multiprocessing.Pool(1, maxtasksperchild=1) as pool:
+        for i, config in enumerate(configs):
+            print(
+                "[INFO] benchmark {}/{} - method {}, processWidth {}".format(
+                    i + 1, len(configs), config[0], config[1]
+                )
+            )
+            result = pool.apply(run, (config,))
+            print(
+                "[INFO] {:.2f} frames/s, {} faces, total p50 {:.1f} ms, p90 {:.1f} ms".format(
+                    result["fps"],
+                    result["faces"],
+                    result["latency"]["total"]["p50"],
+                    result["latency"]["total"]["p90"],
+                )
+            )
+            results.append(result)
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": platform.machine(),
+        "python": sys.version.split()[0],
+        "images": Arguments.get("images"),
+        "results": results,
+    }
+    with open(Arguments.get("output"), "w") as f:
+        json.dump(report, f, indent=2)
+    print("[INFO] results written to " + Arguments.get("output"))
+
+
+# the guard is needed, worker processes import this file again on some platforms
+if __name__ == "__main__":
+    main()
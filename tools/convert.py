@@ -0,0 +1,14 @@
+# import the necessary packages
+from utils.arguments import Arguments
+from utils.store import EncodingStore
+
+# construct the argument parser and parse the arguments
+Arguments.prepareConvertArguments()
+
+# load the old pickle file, the store detects the format on its own
+print("[INFO] loading encodings...")
+store = EncodingStore.load(Arguments.get("input"))
+
+# write it again in the binary format
+print("[INFO] converting {} encodings...".format(len(store)))
+store.save(Arguments.get("output"))
@@ -1,54 +1,151 @@
 # import the necessary packages
-import face_recognition
-import pickle
-import cv2
+import multiprocessing
 import os
+import time
 from utils.image import Image
 from utils.arguments import Arguments
+from utils.encoder import Encoder
+from utils.snapshots import Snapshots
+from utils.store import EncodingStore
 
-# construct the argument parser and parse the arguments
-Arguments.prepareEncodingArguments()
 
-# grab the paths to the input images in our dataset
-print("[INFO] quantifying faces...")
-imagePaths = list(Image.list_images(Arguments.get("dataset")))
+def main():
+    # construct the argument parser and parse the arguments
+    Arguments.prepareEncodingArguments()
 
-# initialize the list of known encodings and known names
-knownEncodings = []
-knownNames = []
+    # grab the paths to the input images in our dataset
+    print("[INFO] quantifying faces...")
+    imagePaths = list(Image.list_images(Arguments.get("dataset")))
 
-# loop over the image paths
-for i, imagePath in enumerate(imagePaths):
-    # extract the person name from the image path
+    # with incremental encoding we reuse the encodings of all images which did
+    # not change since the last run, the manifest in the encodings file tells us
+    previousImages = {}
+    previousHashes = {}
+    previousEncodings = {}
+    if Arguments.get("incremental") and os.path.isfile(Arguments.get("encodings")):
+        previous = EncodingStore.load(Arguments.get("encodings"), mmap=False)
+        previousEncodings = previous.by_image()
+        for image in previous.images:
+            previousImages[image["path"]] = image
+            if "hash" in image:
+                previousHashes[image["hash"]] = image["path"]
+        print("[INFO] loaded manifest with {} images".format(len(previousImages)))
+
+    # find out which images need to be encoded again
+    images = []
+    imageEncodings = {}
+    for imagePath in imagePaths:
+        image = EncodingStore.describe(imagePath)
+
+        # an unchanged size and modification time is good enough, otherwise
+        # the content hash decides (e.g. touched, copied or renamed images)
+        previousImage = previousImages.get(imagePath)
+        if (
+            previousImage is not None
+            and previousImage["size"] == image["size"]
+            and previousImage["mtime"] == image["mtime"]
+            and "hash" in previousImage
+        ):
+            image["hash"] = previousImage["hash"]
+            imageEncodings[imagePath] = previousEncodings[imagePath]
+        else:
+            image["hash"] = EncodingStore.hash(imagePath)
+            if image["hash"] in previousHashes:
+                imageEncodings[imagePath] = previousEncodings[
+                    previousHashes[image["hash"]]
+                ]
+        images.append(image)
+
+    reused = len(imageEncodings)
+
+    # pictures saved by the recognition (extendDataset) come with encodings
+    cached = 0
+    if Arguments.get("snapshotCache"):
+        for image in images:
+            if image["path"] not in imageEncodings:
+                entry = Snapshots.load(Arguments.get("dataset"), image["hash"])
+                if entry is not None and entry["encodings"] is not None:
+                    imageEncodings[image["path"]] = entry["encodings"]
+                    cached += 1
+
+    tasks = [
+        (imagePath, Arguments.get("detection_method"))
+        for imagePath in imagePaths
+        if imagePath not in imageEncodings
+    ]
+
+    # decode, detect and encode the images, either here or in a pool of worker
+    # processes; imap returns the results in the order of the tasks
+    workers = Arguments.get("workers") or os.cpu_count()
+    timings = {stage: 0.0 for stage in Encoder.stages}
+    start = time.perf_counter()
+    pool = None
+    if workers > 1 and len(tasks) > 1:
+        print("[INFO] encoding with {} worker processes...".format(workers))
+        pool = multiprocessing.Pool(workers)
+        results = pool.imap(Encoder.encode_image, tasks)
+    else:
+        results = map(Encoder.encode_image, tasks)
+
+    for i, ((imagePath, _), (encodings, imageTimings)) in enumerate(
+        zip(tasks, results)
+    ):
+        print(
+            "[INFO] processed image {}/{} - {}".format(i + 1, len(tasks), imagePath)
+        )
+        imageEncodings[imagePath] = encodings
+        for stage in Encoder.stages:
+            timings[stage] += imageTimings[stage]
+
+    if pool is not None:
+        pool.close()
+        pool.join()
+    elapsed = time.perf_counter() - start
+
+    # initialize the list of known encodings and known names, and the images
+    # they are coming from
+    knownEncodings = []
+    knownNames = []
+    knownImageIndex = []
+    for i, image in enumerate(images):
+        # extract the person name from the image path
+        name = os.path.basename(os.path.dirname(image["path"]))
+
+        # loop over the encodings
+        for encoding in imageEncodings[image["path"]]:
+            # add each encoding + name to our set of known names and
+            # encodings
+            knownEncodings.append(encoding)
+            knownNames.append(name)
+            knownImageIndex.append(i)
+
+    removed = len(set(previousImages) - set(imagePaths))
     print(
-        "[INFO] processing image {}/{} - {}".format(i + 1, len(imagePaths), imagePath)
+        "[INFO] {} images reused, {} taken from the snapshot cache, {} images encoded, {} images removed".format(
+            reused, cached, len(tasks), removed
+        )
     )
-    name = os.path.basename(os.path.dirname(imagePath))
-
-    # load the input image and convert it from RGB (OpenCV ordering)
-    # to dlib ordering (RGB)
-    image = cv2.imread(imagePath)
-    rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    if len(tasks) > 0:
+        # stage timings are summed over all workers, so they can be larger
+        # than the elapsed time
+        print(
+            "[INFO] {:.2f} images/s, {:.1f}s elapsed ({})".format(
+                len(tasks) / elapsed,
+                elapsed,
+                ", ".join(
+                    "{} {:.1f}s".format(stage, timings[stage])
+                    for stage in Encoder.stages
+                ),
+            )
+        )
 
-    # detect the (x, y)-coordinates of the bounding boxes
-    # corresponding to each face in the input image
-    boxes = face_recognition.face_locations(
-        rgb, model=Arguments.get("detection_method")
+    # dump the facial encodings + names to disk
+    print("[INFO] serializing encodings...")
+    EncodingStore(knownEncodings, knownNames, images, knownImageIndex).save(
+        Arguments.get("encodings")
     )
 
-    # compute the facial embedding for the face
-    encodings = face_recognition.face_encodings(rgb, boxes)
-
-    # loop over the encodings
-    for encoding in encodings:
-        # add each encoding + name to our set of known names and
-        # encodings
-        knownEncodings.append(encoding)
-        knownNames.append(name)
-
-# dump the facial encodings + names to disk
-print("[INFO] serializing encodings...")
-data = {"encodings": knownEncodings, "names": knownNames}
-f = open(Arguments.get("encodings"), "wb")
-f.write(pickle.dumps(data))
-f.close()
+
+# the guard is needed, worker processes import this file again on some platforms
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# import the necessary packages
+import numpy
+import time
+from utils.arguments import Arguments
+from utils.matcher import Matcher
+from utils.pruner import Pruner
+from utils.store import EncodingStore
+
+
+def accuracy(encodings, names, train, test, keep):
+    # share of the held-out encodings which are matched to the right person
+    # by the kept training encodings, and the time per match
+    matcher = Matcher(encodings[keep], [names[i] for i in keep])
+    start = time.perf_counter()
+    predicted, _ = matcher.match(encodings[test], Arguments.get("tolerance"))
+    elapsed = time.perf_counter() - start
+    correct = sum(1 for i, name in zip(test, predicted) if names[i] == name)
+    return correct / float(len(test)), elapsed * 1000 / len(test)
+
+
+def reduce(encodings, names):
+    return Pruner.reduce(
+        encodings,
+        names,
+        Arguments.get("duplicateDistance"),
+        Arguments.get("prototypes"),
+        Arguments.get("removeOutliers"),
+        Arguments.get("seed"),
+    )
+
+
+def main():
+    # construct the argument parser and parse the arguments
+    Arguments.preparePruneArguments()
+
+    print("[INFO] loading encodings...")
+    store = EncodingStore.load(Arguments.get("encodings"), mmap=False)
+    encodings = numpy.ascontiguousarray(store.encodings, dtype=numpy.float32)
+    names = store.names
+    if len(names) == 0:
+        print("[INFO] no encodings found")
+        return
+
+    # flag the encodings which look like another person
+    keep, outliers = reduce(encodings, names)
+    for i in outliers:
+        image = store.imageIndex[i]
+        source = store.images[image]["path"] if image >= 0 else "encoding " + str(i)
+        print("[INFO] outlier of {}: {}".format(names[i], source))
+
+    # size per person before and after
+    people = Pruner.people(names)
+    kept = Pruner.people([names[i] for i in keep])
+    for name in sorted(people):
+        print(
+            "[INFO] {}: {} -> {} encodings".format(
+                name, len(people[name]), len(kept.get(name, []))
+            )
+        )
+    print(
+        "[INFO] {} -> {} encodings ({:.0f}% smaller), {} outliers{}".format(
+            len(names),
+            len(keep),
+            100.0 * (1 - len(keep) / float(len(names))),
+            len(outliers),
+            " removed" if Arguments.get("removeOutliers") else " flagged",
+        )
+    )
+
+    # the effect on the recognition is measured by reducing only a training
+    # split and matching the held-out encodings against it, before and after
+    if Arguments.get("holdout") > 0:
+        train, test = Pruner.split(
+            names, Arguments.get("holdout"), Arguments.get("seed")
+        )
+        if len(test) == 0:
+            print("[INFO] not enough encodings for a held-out split")
+        else:
+            reduced, _ = reduce(encodings[train], [names[i] for i in train])
+            reduced = [train[i] for i in reduced]
+            before = accuracy(encodings, names, train, test, train)
+            after = accuracy(encodings, names, train, test, reduced)
+            print(
+                "[INFO] held-out accuracy {:.1%} -> {:.1%} on {} encodings, {:.3f} -> {:.3f} ms per match".format(
+                    before[0], after[0], len(test), before[1], after[1]
+                )
+            )
+
+    # write the reduced encodings, the manifest keeps all images so an
+    # incremental encode.py does not add the dropped encodings again
+    if Arguments.get("output"):
+        EncodingStore(
+            encodings[keep],
+            [names[i] for i in keep],
+            store.images,
+            store.imageIndex[keep],
+        ).save(Arguments.get("output"))
+        print("[INFO] reduced encodings written to " + Arguments.get("output"))
+
+
+if __name__ == "__main__":
+    main()
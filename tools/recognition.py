@@ -1,18 +1,28 @@
-import base64
-import cv2
-import face_recognition
-import numpy
-import os
-import pickle
-import signal
-import sys
-import threading
 import time
-from datetime import datetime
-from utils.image import Image
-from utils.arguments import Arguments
-from utils.print import Print
-from picamera2 import Picamera2
+from utils.startup import Startup
+
+# everything is timed from here, the imports are the first phase
+startup = Startup()
+with startup.phase("imports"):
+    import cv2
+    import numpy
+    import os
+    import queue
+    import signal
+    import sys
+    import threading
+    from utils.camera import Camera
+    from utils.commands import Commands
+    from utils.matcher import Matcher
+    from utils.metrics import Metrics, NoMetrics
+    from utils.arguments import Arguments
+    from utils.pipeline import FrameQueue, Pipeline
+    from utils.preview import Preview
+    from utils.print import Print
+    from utils.scheduler import Scheduler
+    from utils.snapshots import Snapshots
+    from utils.reloader import Reloader
+    from utils.store import EncodingStore
 
 def signalHandler(signal, frame):
     global closeSafe
@@ -23,10 +33,15 @@ signal.signal(signal.SIGTERM, signalHandler)
 closeSafe = False
 
 external_trigger = True # Default to true to start recognition on startup
+reloader = None
+face_recognition = None
+# commands for the main loop (settings changed at runtime, invalid commands)
+commands = queue.Queue()
 
 def monitor_stdin_for_command():
     """
-    Function for monitoring std input for commands to start or stop face recognition.
+    Function for monitoring std input for commands to start or stop face recognition,
+    to reload the encodings or to change settings (see utils/commands.py).
 
     Note: Avoid putting print statements in this function, as will run asynchronously in 
     a thread. Print statements could get weaved in with other print statements, which may
@@ -35,219 +50,557 @@ def monitor_stdin_for_command():
     global external_trigger
     while True:
         line = sys.stdin.readline()
-        if 'start' in line:
+        if line == '':
+            # If EOF sent, break loop
+            external_trigger = False
+            break
+        try:
+            command = Commands.parse(line)
+        except (TypeError, ValueError, OverflowError) as e:
+            # a broken command must not end the thread, or every later
+            # start, stop and exit would be ignored
+            commands.put({"command": "error", "message": str(e)})
+            continue
+
+        if command["command"] == 'reload':
+            reloader.request()
+        elif command["command"] == 'start':
             external_trigger = True
-        elif 'stop' in line:
+        elif command["command"] == 'stop':
             external_trigger = False
-        elif 'exit' in line or line == '':
-            # If exit or EOF sent, break loop
+        elif command["command"] == 'exit':
             external_trigger = False
             break
+        else:
+            commands.put(command)
 
 # prepare console arguments
 Arguments.prepareRecognitionArguments()
 
+# In standby the models are loaded, but the camera stays off until the
+# first start command
+standby = Arguments.get("run_only_on_notification") and Arguments.get("standby")
+if standby:
+    external_trigger = False
+
+
+def load_matcher(path):
+    data = EncodingStore.load(path)
+    return Matcher(
+        data.encodings, data.names, candidates=Arguments.get("matchCandidates")
+    )
+
+
+def load_models():
+    """
+    Loads everything needed for the recognition while the cameras start:
+    dlib loads its models when face_recognition is imported, the encodings and
+    OpenCV's Haar cascade for face detection. A first detection and encoding
+    on an empty image makes sure the first real frame is not slower.
+    """
+    global face_recognition, Detector, Encoder
+    import face_recognition
+    from utils.detector import Detector
+    from utils.encoder import Encoder
+
+    # the encodings are reloaded in the background when encode.py replaced them
+    reloader = Reloader(
+        Arguments.get("encodings"), load_matcher, interval=Arguments.get("reloadInterval")
+    )
+    detector = Detector(
+        Arguments.get("method"), Arguments.get("detectionMethod"), Arguments.get("cascade")
+    )
+
+    blank = numpy.zeros((150, 150, 3), dtype=numpy.uint8)
+    if detector.method == "cascade":
+        # Haar finds nothing in the empty image, so dlib would be skipped;
+        # both are run directly, which also keeps the warm-up out of the
+        # cascade stats
+        detector.detect_haar(cv2.cvtColor(blank, cv2.COLOR_BGR2GRAY))
+        face_recognition.face_locations(blank, model=detector.detectionMethod)
+    else:
+        detector.detect(blank)
+    face_recognition.face_encodings(blank, [(0, 150, 150, 0)])
+    return reloader, detector
+
+
 # load the known faces and embeddings along with OpenCV's Haar
 # cascade for face detection
 Print.printJson("status", "loading encodings + face detector...")
-data = pickle.loads(open(Arguments.get("encodings"), "rb").read())
-detector = cv2.CascadeClassifier(Arguments.get("cascade"))
+models = startup.background("models", load_models)
 
-# initialize the video stream
+# initialize the video streams, every camera has its own source,
+# preprocessing, face tracks and motion gate
 Print.printJson("status", "starting video stream...")
 processWidth = Arguments.get("processWidth")
-resolution = Arguments.get("resolution").split(",")
-resolution = (int(resolution[0]), int(resolution[1]))
-Print.printJson("status", resolution)
+Print.printJson("status", Arguments.get("resolution"))
 Print.printJson("status", processWidth)
 
-picam2 = Picamera2()
-picam2.configure(picam2.create_preview_configuration(main={"size": (resolution[0], resolution[1]), "format": "XRGB8888"}))
-picam2.start()
-
-
-# variable for prev names
-prevNames = []
-
-# create unknown path if needed
+# the cameras are configured while the models are loading
+with startup.phase("cameras"):
+    cameras = Camera.create(
+        Arguments.get("cameras"),
+        {
+            "name": "default",
+            "priority": 0,
+            "source": Arguments.get("source"),
+            "replayLoop": Arguments.get("replayLoop"),
+            "resolution": Arguments.get("resolution"),
+            "rotateCamera": Arguments.get("rotateCamera"),
+            "brightness": Arguments.get("brightness"),
+            "contrast": Arguments.get("contrast"),
+            "trackEncodeEvery": Arguments.get("trackEncodeEvery"),
+            "motionGate": Arguments.get("motionGate"),
+            "roi": Arguments.get("roi"),
+            "roiFaceSize": Arguments.get("roiFaceSize"),
+            "roiFullScan": Arguments.get("roiFullScan"),
+            "presenceEnter": Arguments.get("presenceEnter"),
+            "presenceWindow": Arguments.get("presenceWindow"),
+            "presenceExit": Arguments.get("presenceExit"),
+        },
+    )
+(reloader, detector) = models()
+reloader.start()
+
+
+def present():
+    # somebody is logged in as long as any camera has them present
+    names = []
+    for camera in cameras:
+        names.extend(n for n in camera.presence.present if n not in names)
+    return names
+
+
+def seen_by(names):
+    # names of the cameras which last saw every name since it logged in,
+    # the most recent first
+    result = {}
+    for n in names:
+        since = logins.get(n, 0)
+        seen = [(c.seen[n], c.name) for c in cameras if c.seen.get(n, -1) >= since]
+        result[n] = [name for _, name in sorted(seen, reverse=True)]
+    return result
+
+
+# capture time of the frame every logged in name logged in with
+logins = {}
+
+
+# create unknown path if needed, snapshots are stored with their encodings
+snapshots = None
 if Arguments.get("extendDataset") is True:
     unknownPath = os.path.dirname(Arguments.get("dataset") + "unknown/")
     try:
         os.stat(unknownPath)
     except:
         os.mkdir(unknownPath)
+    snapshots = Snapshots(
+        Arguments.get("dataset"),
+        maxPerPerson=Arguments.get("maxSnapshots"),
+        minInterval=Arguments.get("snapshotInterval"),
+    )
+    snapshots.start()
 
 tolerance = float(Arguments.get("tolerance"))
 
-# Default to running face recognition
-run_face_recognition = True
+# latency of every stage, reported as metrics message every few seconds
+if Arguments.get("metricsInterval") > 0:
+    metrics = Metrics(Arguments.get("metricsInterval"))
+else:
+    metrics = NoMetrics()
+
+# the processed image is sent to the mirror in the background
+preview = None
+if Arguments.get("outputmm") == 1:
+    preview = Preview(
+        width=Arguments.get("previewWidth"),
+        quality=Arguments.get("previewQuality"),
+        maxFps=Arguments.get("previewFps"),
+        path=Arguments.get("previewFile"),
+    )
+    preview.start()
+
+
+# interval and processing width are fixed, unless they should adapt to
+# whether somebody is in front of the mirror
+if Arguments.get("adaptive"):
+    intervalBounds = Scheduler.parse_bounds(Arguments.get("intervalBounds"))
+    widthBounds = Scheduler.parse_bounds(Arguments.get("processWidthBounds"))
+else:
+    intervalBounds = (Arguments.get("interval"), Arguments.get("interval"))
+    widthBounds = (processWidth, processWidth)
+scheduler = Scheduler(
+    (intervalBounds[0] / 1000, intervalBounds[1] / 1000), widthBounds
+)
+
+
+def interval():
+    # check faster as long as something moves in front of a camera
+    for camera in cameras:
+        if camera.motionGate is not None and camera.motionGate.recent():
+            return min(Arguments.get("motionInterval") / 1000, scheduler.interval)
+    return scheduler.interval
+
+
+def full_frame(job):
+    # the adjusted frame in full resolution is only needed for snapshots, so
+    # it is only computed on demand
+    if job.fullFrame is None:
+        job.fullFrame = cameras[job.camera].preprocessor.full(job.originalFrame)
+    return job.fullFrame
+
+
+def snapshot(job, name):
+    # returns the function the snapshot writer calls to get the full frame
+    # with the boxes and encodings of the given person; tracked faces carry
+    # an older encoding forward, so the encodings are only cached if all
+    # faces of the person were encoded in this frame (None lets encode.py
+    # encode the picture itself)
+    def prepare():
+        fullFrame = full_frame(job)
+        scale = fullFrame.shape[1] / job.frame.shape[1]
+        faces = [i for i, n in enumerate(job.names) if n == name]
+        encodings = None
+        if all(i in job.encoded for i in faces):
+            encodings = [job.encodings[i] for i in faces]
+        return (
+            fullFrame,
+            [[int(value * scale) for value in job.boxes[i]] for i in faces],
+            encodings,
+        )
 
-# If triggering face recognition on external notification, start
-# listener thread for that external trigger
+    return prepare
+
+
+def detect(jobs):
+    """
+    First pipeline stage: prepares the captured frames and finds the face boxes.
+    Gets a list of frames, with the CNN detector a batch (possibly from
+    several cameras) which is run together. With --roi the faces of the last frame
+    are searched around their last position first.
+    """
+    prepared = []
+    fullScan = []
+    for job in jobs:
+        camera = cameras[job.camera]
+        if camera.restarted("detect", job.epoch):
+            # the faces from before the pause are gone
+            if camera.regions is not None:
+                camera.regions.reset()
+            camera.facesPresent = False
+
+        # skip the detection as long as the scene is static and nobody is in
+        # front of the camera
+        if camera.motionGate is not None:
+            with metrics.time("motion"):
+                if not camera.motionGate.check(job.originalFrame, camera.facesPresent):
+                    continue
+
+        # resize image if we wanna process a smaller image, then adjust
+        # brightness, contrast and rotation on the small image
+        with metrics.time("preprocess"):
+            job.frame = camera.preprocessor.process(
+                job.originalFrame, width=scheduler.width
+            )
+        prepared.append(job)
+
+        boxes = None
+        if camera.regions is not None and not camera.regions.due():
+            with metrics.time("detection"):
+                boxes = camera.regions.search(
+                    detector, job.frame, job.originalFrame, camera.preprocessor
+                )
+        if boxes is None:
+            fullScan.append(job)
+        else:
+            camera.regions.update(boxes, False)
+            camera.facesPresent = len(boxes) > 0
+            job.rgb = cv2.cvtColor(job.frame, cv2.COLOR_BGR2RGB)
+            job.boxes = boxes
+
+    with metrics.time("detection"):
+        results = detector.detect_batch([job.frame for job in fullScan])
+
+    for job, (rgb, boxes) in zip(fullScan, results):
+        camera = cameras[job.camera]
+        if camera.regions is not None:
+            camera.regions.update(boxes, True)
+        camera.facesPresent = len(boxes) > 0
+        job.rgb = rgb
+        job.boxes = boxes
+    scheduler.update(any(camera.facesPresent for camera in cameras))
+    return prepared
+
+
+def encode(job):
+    """
+    Second pipeline stage: computes the facial embeddings and matches them
+    against the known faces.
+    """
+    # faces we already know from the previous frames keep their identity,
+    # they are followed between frames so they need not be encoded every time
+    tracker = cameras[job.camera].tracker
+    if cameras[job.camera].restarted("encode", job.epoch):
+        tracker.reset()
+    tracks = tracker.update(job.boxes)
+    stale = [
+        i for i, track in enumerate(tracks) if tracker.needs_encoding(track, tolerance)
+    ]
+
+    # compute the facial embeddings only for new or stale face bounding boxes,
+    # either on the processed frame or on crops of the full resolution frame
+    with metrics.time("encoding"):
+        boxes = [job.boxes[i] for i in stale]
+        if Arguments.get("encodeFullResolution"):
+            encodings = Encoder.encode_crops(
+                job.originalFrame,
+                job.frame.shape,
+                boxes,
+                cameras[job.camera].preprocessor,
+            )
+        else:
+            encodings = face_recognition.face_encodings(job.rgb, boxes)
+
+    # match all faces of the frame at once, faces above the tolerance are unknown
+    with metrics.time("matching"):
+        names, distances = reloader.current.match(encodings, tolerance)
+    job.encoded = stale
+    for i, encoding, name, distance in zip(stale, encodings, names, distances):
+        tracker.assign(tracks[i], encoding, name, distance)
+
+    job.encodings = [track.encoding for track in tracks]
+    job.names = [track.name for track in tracks]
+    job.distances = [track.distance for track in tracks]
+    return job
+
+
+def detect_single(job):
+    # the detect stage without batches, None if the frame was skipped
+    jobs = detect([job])
+    return jobs[0] if len(jobs) > 0 else None
+
+
+# only the CNN detector gains from batches, the others would run the frames
+# of a batch one after the other within the same interval
+if (
+    Arguments.get("method") == "dnn"
+    and Arguments.get("detectionMethod") == "cnn"
+    and Arguments.get("batchSize") > 1
+):
+    detectStage = (
+        "detect",
+        detect,
+        (Arguments.get("batchSize"), Arguments.get("batchWait") / 1000),
+    )
+else:
+    detectStage = ("detect", detect_single)
+
+pipeline = Pipeline(
+    [camera.source for camera in cameras],
+    [detectStage, ("encode", encode)],
+    interval=interval,
+    queueSize=Arguments.get("queueSize"),
+    metrics=metrics,
+    priorities=(
+        [camera.priority for camera in cameras]
+        if Arguments.get("cameraSchedule") == "priority"
+        else None
+    ),
+)
+
+# Default to running face recognition, unless we are waiting in standby
+run_face_recognition = not standby
+
+# Start listener thread for external triggers and reload commands
+stdin_monitoring_thread = threading.Thread(target=monitor_stdin_for_command, daemon=True)
+stdin_monitoring_thread.start()
 if Arguments.get("run_only_on_notification"):
-    stdin_monitoring_thread = threading.Thread(target=monitor_stdin_for_command, daemon=True)
-    stdin_monitoring_thread.start()
     Print.printJson("status", "Started stdin monitoring thread for triggering face recognition.")
 
 
-# loop over frames from the video file stream
+# loop over the processed frames of the pipeline
+Print.printJson("status", {"startup": startup.report()})
 Print.printJson("status", "Starting face recognition loop.")
+pipeline.start(paused=standby)
+lastStatus = time.time()
+# time of the last start command, to report how fast the first frame came
+resumed = None
 while True:
-    loop_start_time = time.time()
-    
+    # settings changed at runtime
+    while not commands.empty():
+        command = commands.get()
+        if command["command"] == "error":
+            Print.printJson("status", {"error": command["message"]})
+            continue
+        if "tolerance" in command:
+            tolerance = command["tolerance"]
+        scheduler.configure(
+            interval=command["interval"] / 1000 if "interval" in command else None,
+            width=command.get("processWidth"),
+        )
+        Print.printJson(
+            "status",
+            {"settings": {"tolerance": tolerance, "schedule": scheduler.stats()}},
+        )
+
     if Arguments.get("run_only_on_notification"):
         if run_face_recognition == False and external_trigger == True:
             # Externally triggered to run face recognition
             Print.printJson("status", "Starting face recognition.")
             run_face_recognition = True
-            picam2.start()
+            scheduler.reset()
+            pipeline.resume()
+            resumed = time.time()
 
         elif run_face_recognition == True and external_trigger == False:
             # Externally triggered to stop face recognition.
             Print.printJson("status", "Stopping face recognition and logging out any logged in users.")
             run_face_recognition = False
-            picam2.stop()
-            
-            # Log out any users that were logged in, and clear prevNames list
-            if prevNames:
-                Print.printJson("logout", {"names": prevNames})
-                prevNames.clear()
-
-    if run_face_recognition:
-        # read the frame
-        originalFrame = picam2.capture_array()
-
-        # adjust image brightness and contrast
-        originalFrame = Image.adjust_brightness_contrast(
-            originalFrame, Arguments.get("brightness"), Arguments.get("contrast")
-        )
-
-        if Arguments.get("rotateCamera") >= 0 and Arguments.get("rotateCamera") <= 2:
-            originalFrame = cv2.rotate(originalFrame, Arguments.get("rotateCamera"))
-
-        # resize image if we wanna process a smaller image
-        if processWidth != resolution[0] and processWidth != 0:
-            frame = Image.resize(originalFrame, width=processWidth)
-        else:
-            frame = originalFrame
-
-        if Arguments.get("method") == "dnn":
-            # load the input image and convert it from BGR (OpenCV ordering)
-            # to dlib ordering (RGB)
-            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            # detect the (x, y)-coordinates of the bounding boxes
-            # corresponding to each face in the input image
-            boxes = face_recognition.face_locations(
-                rgb, model=Arguments.get("detectionMethod")
-            )
-        elif Arguments.get("method") == "haar":
-            # convert the input frame from (1) BGR to grayscale (for face
-            # detection) and (2) from BGR to RGB (for face recognition)
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-            # detect faces in the grayscale frame
-            rects = detector.detectMultiScale(
-                gray,
-                scaleFactor=1.1,
-                minNeighbors=5,
-                minSize=(30, 30),
-                flags=cv2.CASCADE_SCALE_IMAGE,
-            )
-
-            # OpenCV returns bounding box coordinates in (x, y, w, h) order
-            # but we need them in (top, right, bottom, left) order, so we
-            # need to do a bit of reordering
-            boxes = [(y, x + w, y + h, x) for (x, y, w, h) in rects]
-
-        # compute the facial embeddings for each face bounding box
-        encodings = face_recognition.face_encodings(rgb, boxes)
-        names = []
-
-        # loop over the facial embeddings
-        for encoding in encodings:
-            # compute distances between this encoding and the faces in dataset
-            distances = face_recognition.face_distance(data["encodings"], encoding)
-
-            minDistance = 1.0
-            if len(distances) > 0:
-                # the smallest distance is the closest to the encoding
-                minDistance = min(distances)
-
-            # save the name if the distance is below the tolerance
-            if minDistance < tolerance:
-                idx = numpy.where(distances == minDistance)[0][0]
-                name = data["names"][idx]
-            else:
-                name = "unknown"
-
-            # update the list of names
-            names.append(name)
-
-        # loop over the recognized faces
-        for (top, right, bottom, left), name in zip(boxes, names):
-            # draw the predicted face name on the image
-            cv2.rectangle(frame, (left, top), (right, bottom), (0, 255, 0), 2)
-            y = top - 15 if top - 15 > 15 else top + 15
-            txt = name + " (" + "{:.2f}".format(minDistance) + ")"
-            cv2.putText(
-                frame, txt, (left, y), cv2.FONT_HERSHEY_SIMPLEX, 0.75, (0, 255, 0), 2
-            )
+            # the stages reset the tracks and search windows of the cameras
+            # with the first frame after the next start
+            pipeline.pause()
+
+            # Log out any users that were logged in
+            logouts = present()
+            if logouts:
+                Print.printJson(
+                    "logout", {"names": logouts, "cameras": seen_by(logouts)}
+                )
+            for camera in cameras:
+                camera.presence.reset()
+                camera.names = []
+                camera.job = None
+                camera.seen = {}
+            logins = {}
+
+    # report the queue depths and dropped frames of the stages
+    statusInterval = Arguments.get("statusInterval")
+    if statusInterval > 0 and time.time() - lastStatus >= statusInterval:
+        status = {"pipeline": pipeline.stats(), "schedule": scheduler.stats()}
+        if detector.method == "cascade":
+            status["cascade"] = detector.stats()
+        for camera in cameras:
+            if camera.motionGate is not None:
+                status.setdefault("motion", {})[camera.name] = camera.motionGate.stats()
+            if camera.regions is not None:
+                status.setdefault("roi", {})[camera.name] = camera.regions.stats()
+        if preview is not None:
+            status["preview"] = preview.stats()
+        if snapshots is not None:
+            status["snapshots"] = snapshots.stats()
+        Print.printJson("status", status)
+        lastStatus = time.time()
+
+    if metrics.due():
+        Print.printJson("metrics", metrics.report())
+
+    job = pipeline.get(timeout=0.1)
+
+    # replay sources are exhausted after the last frame
+    if job is FrameQueue.END:
+        Print.printJson("status", "frame source exhausted, stopping.")
+        break
 
-        # display the image to our screen
-        if Arguments.get("output") == 1:
-            cv2.imshow("Frame", frame)
-
-        if Arguments.get("outputmm") == 1:
-            retval, buffer = cv2.imencode('.jpg', frame)
-            jpg_as_text = base64.b64encode(buffer).decode()
-            Print.printJson("camera_image", {"image": jpg_as_text})
-
-        # update the FPS counter
-        # fps.update()
-
-        logins = []
-        logouts = []
-        # Check which names are new login and which are new logout with prevNames
-        for n in names:
-            if prevNames.__contains__(n) == False and n is not None:
-                logins.append(n)
-
-                # if extendDataset is active we need to save the picture
-                if Arguments.get("extendDataset") is True:
-                    # set correct path to the dataset
-                    path = os.path.dirname(Arguments.get("dataset") + "/" + n + "/")
-
-                    today = datetime.now()
-                    cv2.imwrite(
-                        path + "/" + n + "_" + today.strftime("%Y%m%d_%H%M%S") + ".jpg",
-                        originalFrame,
-                    )
-        for n in prevNames:
-            if names.__contains__(n) == False and n is not None:
-                logouts.append(n)
-
-        # send inforrmation to prompt, only if something has changes
-        if logins.__len__() > 0:
-            Print.printJson("login", {"names": logins})
-
-        if logouts.__len__() > 0:
-            Print.printJson("logout", {"names": logouts})
-
-        # set this names as new prev names for next iteration
-        prevNames = names
+    if job is not None and run_face_recognition:
+        # all messages about this frame are written at once, tagged with the
+        # time it was captured
+        with Print.batch(job.captured):
+            if resumed is not None:
+                Print.printJson(
+                    "status",
+                    {"firstRecognition": int((time.time() - resumed) * 1000)},
+                )
+                resumed = None
+
+            camera = cameras[job.camera]
+            frame = job.frame
+
+            camera.names = job.names
+            camera.job = job
+            for n in job.names:
+                camera.seen[n] = job.captured
+
+            # loop over the recognized faces
+            for (top, right, bottom, left), name, distance in zip(
+                job.boxes, job.names, job.distances
+            ):
+                # draw the predicted face name on the image
+                cv2.rectangle(frame, (left, top), (right, bottom), (0, 255, 0), 2)
+                y = top - 15 if top - 15 > 15 else top + 15
+                txt = name + " (" + "{:.2f}".format(distance) + ")"
+                cv2.putText(
+                    frame,
+                    txt,
+                    (left, y),
+                    cv2.FONT_HERSHEY_SIMPLEX,
+                    0.75,
+                    (0, 255, 0),
+                    2,
+                )
+
+            # display the image to our screen
+            if Arguments.get("output") == 1:
+                title = "Frame" if len(cameras) == 1 else "Frame " + camera.name
+                cv2.imshow(title, frame)
+
+            if preview is not None:
+                preview.submit(frame)
+
+            # Check which names are new login and which are new logout, a name
+            # has to be seen (or missed) in enough frames first; the names only
+            # count for the camera whose frame they are from
+            before = present()
+            camera.presence.update(job.names)
+            after = present()
+            newLogins = [n for n in after if n not in before]
+            logouts = [n for n in before if n not in after]
+            for n in newLogins:
+                logins[n] = job.captured
+
+            # if extendDataset is active we need to save the picture,
+            # together with the boxes and encodings of this person
+            if snapshots is not None:
+                # the login can be triggered by a frame of another camera, the
+                # picture is taken from the last frame of a camera seeing them
+                for n in newLogins:
+                    seen = [c.job for c in cameras if n in c.names]
+                    if len(seen) > 0:
+                        snapshots.submit(n, snapshot(seen[0], n))
+
+            # send inforrmation to prompt, only if something has changes
+            # every name is tagged with the cameras which see it (login) or
+            # saw it last (logout), not with the camera of this frame
+            if newLogins.__len__() > 0:
+                Print.printJson(
+                    "login",
+                    {
+                        "names": newLogins,
+                        "cameras": {
+                            n: [c.name for c in cameras if n in c.names]
+                            for n in newLogins
+                        },
+                        "confidence": {
+                            n: max(c.presence.confidence(n) for c in cameras)
+                            for n in newLogins
+                        },
+                    },
+                )
+
+            if logouts.__len__() > 0:
+                Print.printJson(
+                    "logout", {"names": logouts, "cameras": seen_by(logouts)}
+                )
+                for n in logouts:
+                    del logins[n]
 
     key = cv2.waitKey(1) & 0xFF
     # if the `q` key was pressed, break from the loop
     if key == ord("q") or closeSafe == True:
         break
-    
-    # Calculate how long the loop ran thus far. If loop time was less than 
-    # the specified interval, sleep more to meet the target interval
-    loop_time = time.time() - loop_start_time
-    time.sleep(max(0.0, Arguments.get("interval") / 1000 - loop_time))
 
 
 # do a bit of cleanup
-picam2.stop()
+pipeline.stop()
+for camera in cameras:
+    camera.source.close()
 cv2.destroyAllWindows()
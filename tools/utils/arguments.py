@@ -31,6 +31,176 @@ class Arguments:
             default="hog",
             help="face detection model to use: either `hog` or `cnn`",
         )
+        ap.add_argument(
+            "-inc",
+            "--incremental",
+            type=Helper.str2bool,
+            required=False,
+            default=False,
+            help="only encode images which were added or changed since the last run",
+        )
+        ap.add_argument(
+            "-w",
+            "--workers",
+            type=int,
+            required=False,
+            default=1,
+            help="number of processes encoding images in parallel (0 = one per CPU core)",
+        )
+        ap.add_argument(
+            "-sc",
+            "--snapshotCache",
+            type=Helper.str2bool,
+            required=False,
+            default=True,
+            help="reuse the encodings the recognition stored for pictures saved with extendDataset",
+        )
+
+        Arguments.args = vars(ap.parse_args())
+
+    def prepareConvertArguments():
+        ap = argparse.ArgumentParser()
+        ap.add_argument(
+            "-i",
+            "--input",
+            required=True,
+            help="path to the encodings pickle written by older versions",
+        )
+        ap.add_argument(
+            "-o",
+            "--output",
+            required=True,
+            help="path to the converted encodings file",
+        )
+
+        Arguments.args = vars(ap.parse_args())
+
+    def preparePruneArguments():
+        ap = argparse.ArgumentParser()
+        ap.add_argument(
+            "-e",
+            "--encodings",
+            required=True,
+            help="path to the encodings file",
+        )
+        ap.add_argument(
+            "-o",
+            "--output",
+            type=str,
+            default="",
+            help="path to write the reduced encodings to (empty = only report)",
+        )
+        ap.add_argument(
+            "-dd",
+            "--duplicateDistance",
+            type=float,
+            default=0.15,
+            help="encodings of a person closer than this are near-duplicates, only the first is kept (0 = keep all)",
+        )
+        ap.add_argument(
+            "-p",
+            "--prototypes",
+            type=int,
+            default=0,
+            help="cluster every person into this many prototypes (0 = keep all remaining encodings)",
+        )
+        ap.add_argument(
+            "-ro",
+            "--removeOutliers",
+            type=Helper.str2bool,
+            default=False,
+            help="remove the encodings closer to another person instead of only listing them",
+        )
+        ap.add_argument(
+            "-t",
+            "--tolerance",
+            type=float,
+            default=0.6,
+            help="tolerance to measure the accuracy with",
+        )
+        ap.add_argument(
+            "-ho",
+            "--holdout",
+            type=float,
+            default=0.2,
+            help="share of every person's encodings held out to measure the accuracy (0 = off)",
+        )
+        ap.add_argument(
+            "-s",
+            "--seed",
+            type=int,
+            default=0,
+            help="seed of the held-out split and the clustering",
+        )
+
+        Arguments.args = vars(ap.parse_args())
+
+    def prepareBenchmarkArguments():
+        ap = argparse.ArgumentParser()
+        ap.add_argument(
+            "-i",
+            "--images",
+            required=False,
+            default="../dataset/",
+            help="path to a directory of images to run the benchmark on",
+        )
+        ap.add_argument(
+            "-e",
+            "--encodings",
+            required=False,
+            default=None,
+            help="path to the encodings to benchmark matching (optional)",
+        )
+        ap.add_argument(
+            "-c",
+            "--cascade",
+            type=str,
+            required=False,
+            default="../model/haarcascade_frontalface_default.xml",
+            help="path to where the face cascade resides",
+        )
+        ap.add_argument(
+            "-m",
+            "--methods",
+            type=str,
+            default="hog,cnn,haar,cascade",
+            help="comma separated detection methods to compare (hog, cnn, haar, cascade = haar confirmed by hog)",
+        )
+        ap.add_argument(
+            "-pw",
+            "--processWidths",
+            type=str,
+            default="320,500,800",
+            help="comma separated process widths to compare (0 = original size)",
+        )
+        ap.add_argument(
+            "-t",
+            "--tolerance",
+            type=float,
+            default=0.6,
+            help="tolerance used for matching",
+        )
+        ap.add_argument(
+            "-l",
+            "--limit",
+            type=int,
+            default=0,
+            help="maximum number of images to use (0 = all)",
+        )
+        ap.add_argument(
+            "-r",
+            "--repeat",
+            type=int,
+            default=1,
+            help="how many times every image is processed",
+        )
+        ap.add_argument(
+            "-o",
+            "--output",
+            type=str,
+            default="benchmark.json",
+            help="path to the JSON file with the results",
+        )
 
         Arguments.args = vars(ap.parse_args())
 
@@ -66,7 +236,7 @@ class Arguments:
             type=str,
             required=False,
             default="dnn",
-            help="method to detect faces (dnn, haar)",
+            help="method to detect faces (dnn, haar, cascade = haar confirmed by dnn)",
         )
         ap.add_argument(
             "-d",
@@ -76,6 +246,22 @@ class Arguments:
             default="hog",
             help="face detection model to use: either `hog` or `cnn`",
         )
+        ap.add_argument(
+            "-bs",
+            "--batchSize",
+            type=int,
+            required=False,
+            default=1,
+            help="Number of frames detected together with the cnn model",
+        )
+        ap.add_argument(
+            "-bw",
+            "--batchWait",
+            type=int,
+            required=False,
+            default=50,
+            help="Maximum ms to wait for frames to fill a detection batch",
+        )
         ap.add_argument(
             "-i",
             "--interval",
@@ -95,6 +281,34 @@ class Arguments:
             default=0,
             help="Show output on magic mirror",
         )
+        ap.add_argument(
+            "-pvw",
+            "--previewWidth",
+            type=int,
+            default=0,
+            help="Width of the image shown on magic mirror (0 = process width)",
+        )
+        ap.add_argument(
+            "-pvq",
+            "--previewQuality",
+            type=int,
+            default=80,
+            help="JPEG quality of the image shown on magic mirror (0-100)",
+        )
+        ap.add_argument(
+            "-pvf",
+            "--previewFps",
+            type=float,
+            default=5,
+            help="Maximum frames per second of the image shown on magic mirror (0 = unlimited)",
+        )
+        ap.add_argument(
+            "-pvp",
+            "--previewFile",
+            type=str,
+            default="",
+            help="Write the image shown on magic mirror to this file instead of sending it as base64 JSON",
+        )
         ap.add_argument(
             "-eds",
             "--extendDataset",
@@ -103,6 +317,22 @@ class Arguments:
             default=False,
             help="Extend Dataset with unknown pictures",
         )
+        ap.add_argument(
+            "-ms",
+            "--maxSnapshots",
+            type=int,
+            required=False,
+            default=0,
+            help="Maximum number of pictures kept per person when extending the dataset (0 = unlimited)",
+        )
+        ap.add_argument(
+            "-sni",
+            "--snapshotInterval",
+            type=int,
+            required=False,
+            default=60,
+            help="Minimum seconds between two pictures of the same person when extending the dataset",
+        )
         ap.add_argument(
             "-ds",
             "--dataset",
@@ -118,6 +348,60 @@ class Arguments:
             default=0.6,
             help="How much distance between faces to consider it a match. Lower is more strict.",
         )
+        ap.add_argument(
+            "-mc",
+            "--matchCandidates",
+            type=int,
+            default=0,
+            help="Only compare faces with the encodings of the N persons with the closest mean encoding (0 = all persons)",
+        )
+        ap.add_argument(
+            "-rli",
+            "--reloadInterval",
+            type=int,
+            default=5,
+            help="Seconds between checks if the encodings file has changed (0 = only reload on command)",
+        )
+        ap.add_argument(
+            "-tee",
+            "--trackEncodeEvery",
+            type=int,
+            default=5,
+            help="Encode a face followed between frames only every N frames (1 = every frame)",
+        )
+        ap.add_argument(
+            "-mg",
+            "--motionGate",
+            type=int,
+            default=0,
+            help="Skip face detection while the scene is static, sensitivity 1-100 (0 = off)",
+        )
+        ap.add_argument(
+            "-mi",
+            "--motionInterval",
+            type=int,
+            default=500,
+            help="Interval between recognitions while motion is detected",
+        )
+        ap.add_argument(
+            "-ad",
+            "--adaptive",
+            type=Helper.str2bool,
+            default=False,
+            help="Adapt interval and process width to whether faces are in front of the camera",
+        )
+        ap.add_argument(
+            "-ib",
+            "--intervalBounds",
+            default="500,8000",
+            help="Minimum and maximum interval with --adaptive",
+        )
+        ap.add_argument(
+            "-pwb",
+            "--processWidthBounds",
+            default="320,800",
+            help="Minimum and maximum process width with --adaptive",
+        )
         ap.add_argument(
             "-br",
             "--brightness",
@@ -140,6 +424,55 @@ class Arguments:
             default=500,
             help="Resolution of the image which will be processed from OpenCV",
         )
+        ap.add_argument(
+            "-pe",
+            "--presenceEnter",
+            type=int,
+            default=1,
+            help="Number of frames within --presenceWindow a person has to be seen in to log in",
+        )
+        ap.add_argument(
+            "-pwi",
+            "--presenceWindow",
+            type=int,
+            default=1,
+            help="Number of last frames --presenceEnter is counted in",
+        )
+        ap.add_argument(
+            "-px",
+            "--presenceExit",
+            type=int,
+            default=1,
+            help="Number of frames in a row without a person until they log out",
+        )
+        ap.add_argument(
+            "-roi",
+            "--roi",
+            type=Helper.str2bool,
+            default=False,
+            help="Search faces around their position in the last frame first, the whole frame only periodically or if they were not found",
+        )
+        ap.add_argument(
+            "-rfs",
+            "--roiFaceSize",
+            type=int,
+            default=120,
+            help="Width in pixels a face is scaled to for the search around its last position",
+        )
+        ap.add_argument(
+            "-rfu",
+            "--roiFullScan",
+            type=int,
+            default=10,
+            help="Search the whole frame at least every x frames with --roi, to find new faces",
+        )
+        ap.add_argument(
+            "-efr",
+            "--encodeFullResolution",
+            type=Helper.str2bool,
+            default=False,
+            help="Detect faces on the processed image, but encode them on crops of the full resolution image",
+        )
         ap.add_argument(
             "-roon",
             "--run-only-on-notification",
@@ -147,5 +480,61 @@ class Arguments:
             default=0,
             help="If 1, only runs face detection upon external trigger. If 0, face detection runs all the time.",
         )
+        ap.add_argument(
+            "-sb",
+            "--standby",
+            type=Helper.str2bool,
+            default=False,
+            help="With --run-only-on-notification, load the models but keep the camera off until the first start command",
+        )
+        ap.add_argument(
+            "-src",
+            "--source",
+            type=str,
+            default="picamera",
+            help="Frame source (picamera, opencv:<device>, images:<folder>, video:<file>)",
+        )
+        ap.add_argument(
+            "-loop",
+            "--replayLoop",
+            type=Helper.str2bool,
+            default=False,
+            help="Restart image folder and video sources from the beginning when they are exhausted",
+        )
+        ap.add_argument(
+            "-cam",
+            "--cameras",
+            type=str,
+            default="",
+            help="JSON list of cameras, each with name, source, resolution, rotateCamera, brightness, contrast and priority (default: one camera from the other arguments)",
+        )
+        ap.add_argument(
+            "-cs",
+            "--cameraSchedule",
+            type=str,
+            default="roundrobin",
+            help="Order in which frames of several cameras are processed (roundrobin, priority = weighted round robin, priority p gets p + 1 turns per turn of priority 0)",
+        )
+        ap.add_argument(
+            "-qs",
+            "--queueSize",
+            type=int,
+            default=1,
+            help="Number of frames which can wait between two pipeline stages",
+        )
+        ap.add_argument(
+            "-si",
+            "--statusInterval",
+            type=int,
+            default=60,
+            help="Seconds between pipeline status messages (0 = off)",
+        )
+        ap.add_argument(
+            "-mti",
+            "--metricsInterval",
+            type=int,
+            default=0,
+            help="Seconds between metrics messages with the latency of every stage (0 = off)",
+        )
 
         Arguments.args = vars(ap.parse_args())
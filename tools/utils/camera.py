@@ -0,0 +1,77 @@
+import json
+from utils.motion import MotionGate
+from utils.preprocess import Preprocessor
+from utils.presence import Presence
+from utils.regions import RegionSearch
+from utils.source import FrameSource
+from utils.tracker import Tracker
+
+
+class Camera:
+    # One camera of the recognizer with everything which is specific to it:
+    # its frame source, preprocessing, face tracks and motion gate, and the
+    # names it saw in its last frame. Encodings and detection are shared.
+    def __init__(self, config, defaults):
+        # config is a dict from --cameras, missing keys are taken from the
+        # defaults (the single camera arguments)
+        settings = dict(defaults)
+        settings.update(config)
+
+        self.name = settings["name"]
+        self.priority = int(settings["priority"])
+        resolution = settings["resolution"]
+        if isinstance(resolution, str):
+            resolution = resolution.split(",")
+        resolution = (int(resolution[0]), int(resolution[1]))
+
+        self.source = FrameSource.create(
+            settings["source"], resolution, loop=settings["replayLoop"]
+        )
+        self.preprocessor = Preprocessor(
+            settings["brightness"], settings["contrast"], int(settings["rotateCamera"])
+        )
+        self.tracker = Tracker(encodeEvery=settings["trackEncodeEvery"])
+        self.motionGate = None
+        if settings["motionGate"] > 0:
+            self.motionGate = MotionGate(sensitivity=settings["motionGate"])
+        self.regions = None
+        if settings["roi"]:
+            self.regions = RegionSearch(
+                faceSize=settings["roiFaceSize"],
+                fullScanEvery=settings["roiFullScan"],
+            )
+        # who is in front of this camera, decided over its last frames
+        self.presence = Presence(
+            enterFrames=settings["presenceEnter"],
+            window=settings["presenceWindow"],
+            exitFrames=settings["presenceExit"],
+        )
+        self.facesPresent = False
+        self.names = []
+        # the last processed frame, the names are from it
+        self.job = None
+        # capture time of the last frame every name was seen in
+        self.seen = {}
+        # pipeline epoch of the last frame every stage processed
+        self.epochs = {}
+
+    def restarted(self, stage, epoch):
+        # whether the frame is the first one of the stage since the pipeline
+        # was paused, its state from before has to be reset then; every
+        # stage resets its own state on its own thread
+        if self.epochs.get(stage, 0) == epoch:
+            return False
+        self.epochs[stage] = epoch
+        return True
+
+    def create(configs, defaults):
+        # all cameras from the JSON list of --cameras, or the single camera
+        # configured by the other arguments if the list is empty
+        configs = json.loads(configs) if configs else []
+        if len(configs) == 0:
+            configs = [{}]
+        cameras = []
+        for i, config in enumerate(configs):
+            config.setdefault("name", defaults["name"] if len(configs) == 1 else str(i))
+            cameras.append(Camera(config, defaults))
+        return cameras
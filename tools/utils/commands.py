@@ -0,0 +1,55 @@
+import json
+import math
+
+
+class Commands:
+    # Commands on the standard input, one per line. node_helper.js sends JSON
+    # objects like {"command": "set", "tolerance": 0.5}; for testing in a
+    # terminal the same can be typed as "set tolerance=0.5".
+    names = ("start", "stop", "reload", "exit", "set")
+    # parameters which can be changed at runtime and their types
+    settings = {"interval": int, "tolerance": float, "processWidth": int}
+
+    def parse(line):
+        # returns the command as a dict, raises ValueError if it is invalid
+        line = line.strip()
+        if line.startswith("{") or line.startswith('"'):
+            command = json.loads(line)
+            if isinstance(command, str):
+                # older versions of node_helper.js sent plain JSON strings
+                command = {"command": command}
+        else:
+            words = line.split()
+            if len(words) == 0:
+                raise ValueError("empty command")
+            command = {"command": words[0]}
+            for word in words[1:]:
+                (key, _, value) = word.partition("=")
+                command[key] = value
+
+        if (
+            not isinstance(command, dict)
+            or command.get("command") not in Commands.names
+        ):
+            raise ValueError("unknown command: " + line)
+
+        if command["command"] == "set":
+            for key, value in list(command.items()):
+                if key == "command":
+                    continue
+                if key not in Commands.settings:
+                    raise ValueError("unknown setting: " + key)
+                # anything from another module ends up here, so only plain
+                # finite numbers (or their text) are accepted
+                if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+                    raise ValueError("{} must be a number".format(key))
+                try:
+                    value = float(value)
+                    if not math.isfinite(value):
+                        raise ValueError
+                    command[key] = Commands.settings[key](value)
+                except (ValueError, OverflowError):
+                    raise ValueError("{} must be a number".format(key))
+                if command[key] <= 0:
+                    raise ValueError("{} must be positive".format(key))
+        return command
@@ -0,0 +1,124 @@
+import cv2
+import face_recognition
+from utils.tracker import Tracker
+
+
+class Detector:
+    # Finds the face boxes in a frame, either with dlib (dnn: hog or cnn),
+    # with OpenCV's Haar cascade, or with both (cascade): the fast but noisy
+    # Haar cascade screens the frame and dlib only confirms the faces around
+    # where it fired. Boxes are in (top, right, bottom, left) order, like
+    # face_recognition uses them.
+    # margin around a Haar box for the confirmation, in box widths / heights
+    margin = 0.5
+    # Haar boxes are scaled up to this size, so dlib can find the face in them
+    minFace = 80
+
+    def __init__(self, method="dnn", detectionMethod="hog", cascade=None):
+        self.method = method
+        self.detectionMethod = detectionMethod
+        self.cascade = None
+        if method in ("haar", "cascade"):
+            self.cascade = cv2.CascadeClassifier(cascade)
+        # frames on which Haar fired (hits) or not (misses, dlib was
+        # skipped) and Haar boxes dlib did not confirm
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0
+
+    def detect(self, frame):
+        # returns the frame in RGB (needed for the encodings) and the boxes
+        # load the input image and convert it from BGR (OpenCV ordering)
+        # to dlib ordering (RGB)
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+        if self.method == "dnn":
+            # detect the (x, y)-coordinates of the bounding boxes
+            # corresponding to each face in the input image
+            boxes = face_recognition.face_locations(rgb, model=self.detectionMethod)
+        elif self.method == "haar":
+            # convert the input frame from BGR to grayscale for face detection
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            boxes = self.detect_haar(gray)
+        elif self.method == "cascade":
+            boxes = self.detect_cascade(frame, rgb)
+        else:
+            raise ValueError("unknown detection method: " + self.method)
+
+        return rgb, boxes
+
+    def detect_haar(self, gray):
+        # detect faces in the grayscale frame
+        rects = self.cascade.detectMultiScale(
+            gray,
+            scaleFactor=1.1,
+            minNeighbors=5,
+            minSize=(30, 30),
+            flags=cv2.CASCADE_SCALE_IMAGE,
+        )
+
+        # OpenCV returns bounding box coordinates in (x, y, w, h) order
+        # but we need them in (top, right, bottom, left) order, so we
+        # need to do a bit of reordering
+        return [(y, x + w, y + h, x) for (x, y, w, h) in rects]
+
+    def detect_cascade(self, frame, rgb):
+        candidates = self.detect_haar(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+        if len(candidates) == 0:
+            self.misses += 1
+            return []
+        self.hits += 1
+
+        (height, width) = rgb.shape[:2]
+        boxes = []
+        for top, right, bottom, left in candidates:
+            dx = int((right - left) * Detector.margin)
+            dy = int((bottom - top) * Detector.margin)
+            (top, right) = (max(0, top - dy), min(width, right + dx))
+            (bottom, left) = (min(height, bottom + dy), max(0, left - dx))
+            crop = rgb[top:bottom, left:right]
+            zoom = max(
+                1.0, Detector.minFace * (1 + 2 * Detector.margin) / crop.shape[1]
+            )
+            if zoom > 1.0:
+                crop = cv2.resize(crop, None, fx=zoom, fy=zoom)
+
+            found = face_recognition.face_locations(crop, model=self.detectionMethod)
+            if len(found) == 0:
+                self.rejected += 1
+            for t, r, b, l in found:
+                box = (
+                    int(top + t / zoom),
+                    int(left + r / zoom),
+                    int(top + b / zoom),
+                    int(left + l / zoom),
+                )
+                # Haar often fires several times for the same face
+                if all(Tracker.overlap(box, other) < 0.5 for other in boxes):
+                    boxes.append(box)
+        return boxes
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "rejected": self.rejected}
+
+    def detect_batch(self, frames):
+        # Like detect for several frames. The CNN detector runs frames of the
+        # same size together, which is much more efficient (especially on a
+        # GPU) than one frame after the other.
+        if self.method != "dnn" or self.detectionMethod != "cnn" or len(frames) < 2:
+            return [self.detect(frame) for frame in frames]
+
+        rgbs = [cv2.cvtColor(frame, cv2.COLOR_BGR2RGB) for frame in frames]
+        results = [None] * len(frames)
+        shapes = {}
+        for i, rgb in enumerate(rgbs):
+            shapes.setdefault(rgb.shape, []).append(i)
+        for indexes in shapes.values():
+            batch = face_recognition.batch_face_locations(
+                [rgbs[i] for i in indexes],
+                number_of_times_to_upsample=1,
+                batch_size=len(indexes),
+            )
+            for i, boxes in zip(indexes, batch):
+                results[i] = (rgbs[i], boxes)
+        return results
@@ -0,0 +1,77 @@
+import cv2
+import face_recognition
+import time
+
+
+class Encoder:
+    # stages which are timed while encoding one image
+    stages = ("read", "detect", "encode")
+
+    def encode_image(task):
+        # Encodes all faces of one image. Kept free of global state, so it can
+        # run in a worker process; returns the encodings and the seconds
+        # spent in every stage.
+        (imagePath, detectionMethod) = task
+        timings = {}
+
+        # load the input image and convert it from RGB (OpenCV ordering)
+        # to dlib ordering (RGB)
+        start = time.perf_counter()
+        rgb = cv2.cvtColor(cv2.imread(imagePath), cv2.COLOR_BGR2RGB)
+        timings["read"] = time.perf_counter() - start
+
+        # detect the (x, y)-coordinates of the bounding boxes
+        # corresponding to each face in the input image
+        start = time.perf_counter()
+        boxes = face_recognition.face_locations(rgb, model=detectionMethod)
+        timings["detect"] = time.perf_counter() - start
+
+        # compute the facial embedding for the face
+        start = time.perf_counter()
+        encodings = face_recognition.face_encodings(rgb, boxes)
+        timings["encode"] = time.perf_counter() - start
+
+        return encodings, timings
+
+    def encode_crops(originalFrame, shape, boxes, preprocessor, margin=0.25):
+        # Encodes faces which were detected on the processed frame (of the
+        # given shape) on crops of the captured full resolution frame. Only
+        # the crops are preprocessed and converted to RGB, the full frame is
+        # never touched as a whole.
+        if len(boxes) == 0:
+            return []
+        (height, width) = shape[:2]
+        scale = preprocessor.width(originalFrame.shape) / float(width)
+        encodings = []
+        for top, right, bottom, left in boxes:
+            # add some margin, the landmark detection needs a bit of context
+            # around the face
+            dx = int((right - left) * margin)
+            dy = int((bottom - top) * margin)
+            window = (
+                max(0, top - dy),
+                min(width, right + dx),
+                min(height, bottom + dy),
+                max(0, left - dx),
+            )
+            crop = cv2.cvtColor(
+                preprocessor.region(originalFrame, window, scale, None),
+                cv2.COLOR_BGR2RGB,
+            )
+
+            # the box in full resolution, relative to the crop
+            (y0, x0) = (int(window[0] * scale), int(window[3] * scale))
+            encodings.extend(
+                face_recognition.face_encodings(
+                    crop,
+                    [
+                        (
+                            int(top * scale) - y0,
+                            int(right * scale) - x0,
+                            int(bottom * scale) - y0,
+                            int(left * scale) - x0,
+                        )
+                    ],
+                )
+            )
+        return encodings
@@ -0,0 +1,81 @@
+import numpy
+
+
+class Matcher:
+    # Nearest neighbour search over the known encodings. All encodings are
+    # kept in one contiguous float32 matrix which is built once, so the faces
+    # of a frame are matched with a single matrix multiplication instead of
+    # one face_distance call (and list re-stacking) per face.
+    def __init__(self, encodings, names, candidates=0):
+        # candidates > 0 only compares a face with the encodings of the
+        # persons whose mean encoding (centroid) is among the closest ones
+        self.candidates = candidates
+        self.people = sorted(set(names))
+        index = {name: i for i, name in enumerate(self.people)}
+
+        self.matrix = numpy.ascontiguousarray(
+            numpy.asarray(encodings, dtype=numpy.float32).reshape(-1, 128)
+        )
+        self.labels = numpy.array([index[name] for name in names], dtype=numpy.int32)
+        self.norms = numpy.einsum("ij,ij->i", self.matrix, self.matrix)
+
+        self.centroids = numpy.zeros((len(self.people), 128), dtype=numpy.float32)
+        for i in range(len(self.people)):
+            self.centroids[i] = self.matrix[self.labels == i].mean(axis=0)
+        self.centroidNorms = numpy.einsum("ij,ij->i", self.centroids, self.centroids)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def distances(self, encodings, matrix, norms):
+        # euclidean distances of all faces to all rows, using
+        # |a - b|^2 = |a|^2 + |b|^2 - 2ab
+        squared = (
+            numpy.einsum("ij,ij->i", encodings, encodings)[:, None]
+            + norms[None, :]
+            - 2.0 * (encodings @ matrix.T)
+        )
+        return numpy.sqrt(numpy.maximum(squared, 0.0))
+
+    def nearest(self, encodings):
+        # index of the closest known encoding and its distance for every face
+        encodings = numpy.asarray(encodings, dtype=numpy.float32).reshape(-1, 128)
+        if len(encodings) == 0 or len(self.labels) == 0:
+            return (
+                numpy.full(len(encodings), -1, dtype=numpy.int64),
+                numpy.ones(len(encodings), dtype=numpy.float32),
+            )
+
+        if 0 < self.candidates < len(self.people):
+            # only keep the persons with the closest centroids per face
+            centroidDistances = self.distances(
+                encodings, self.centroids, self.centroidNorms
+            )
+            people = numpy.argpartition(
+                centroidDistances, self.candidates - 1, axis=1
+            )[:, : self.candidates]
+
+            # compare all faces with the union of the candidates in one go and
+            # hide the rows which are not a candidate of the respective face
+            rows = numpy.flatnonzero(numpy.isin(self.labels, people))
+            distances = self.distances(encodings, self.matrix[rows], self.norms[rows])
+            allowed = (self.labels[rows][None, :, None] == people[:, None, :]).any(axis=2)
+            distances[~allowed] = numpy.inf
+        else:
+            rows = numpy.arange(len(self.labels))
+            distances = self.distances(encodings, self.matrix, self.norms)
+
+        best = numpy.argmin(distances, axis=1)
+        return rows[best], distances[numpy.arange(len(encodings)), best]
+
+    def match(self, encodings, tolerance):
+        # name and distance of the best match for every face, faces without a
+        # match closer than the tolerance are "unknown"
+        (indexes, distances) = self.nearest(encodings)
+        names = []
+        for index, distance in zip(indexes, distances):
+            if index >= 0 and distance < tolerance:
+                names.append(self.people[self.labels[index]])
+            else:
+                names.append("unknown")
+        return names, [float(distance) for distance in distances]
@@ -0,0 +1,101 @@
+import collections
+import contextlib
+import threading
+import time
+
+
+class Histogram:
+    # upper bounds of the buckets in milliseconds, the last one catches the rest
+    bounds = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, float("inf"))
+
+    def __init__(self):
+        self.counts = [0] * len(Histogram.bounds)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def record(self, milliseconds):
+        for i, bound in enumerate(Histogram.bounds):
+            if milliseconds <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.sum += milliseconds
+        self.max = max(self.max, milliseconds)
+
+    def percentile(self, fraction):
+        # upper bound of the bucket the percentile falls in
+        target = fraction * self.count
+        seen = 0
+        for bound, count in zip(Histogram.bounds, self.counts):
+            seen += count
+            if seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean": round(self.sum / self.count, 2),
+            "p50": round(self.percentile(0.5), 2),
+            "p90": round(self.percentile(0.9), 2),
+            "p99": round(self.percentile(0.99), 2),
+            "max": round(self.max, 2),
+            "histogram": {
+                ("<=" + str(bound) if bound != float("inf") else "more"): count
+                for bound, count in zip(Histogram.bounds, self.counts)
+                if count > 0
+            },
+        }
+
+
+class Metrics:
+    # Collects the latency of the recognition stages in histograms, which are
+    # reported and reset every interval seconds.
+    def __init__(self, interval):
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.histograms = collections.OrderedDict()
+        self.started = time.time()
+
+    @contextlib.contextmanager
+    def time(self, stage):
+        start = time.perf_counter()
+        yield
+        self.record(stage, time.perf_counter() - start)
+
+    def record(self, stage, seconds):
+        with self.lock:
+            if stage not in self.histograms:
+                self.histograms[stage] = Histogram()
+            self.histograms[stage].record(seconds * 1000)
+
+    def due(self):
+        return time.time() - self.started >= self.interval
+
+    def report(self):
+        # summary of all stages since the last report
+        with self.lock:
+            (histograms, self.histograms) = (self.histograms, collections.OrderedDict())
+            elapsed = time.time() - self.started
+            self.started = time.time()
+        return {
+            "seconds": round(elapsed, 1),
+            "stages": {
+                stage: histogram.summary() for stage, histogram in histograms.items()
+            },
+        }
+
+
+class NoMetrics:
+    # used if metrics are turned off, so the instrumentation costs nothing
+    timer = contextlib.nullcontext()
+
+    def time(self, stage):
+        return NoMetrics.timer
+
+    def record(self, stage, seconds):
+        pass
+
+    def due(self):
+        return False
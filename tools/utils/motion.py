@@ -0,0 +1,64 @@
+import cv2
+import time
+
+
+class MotionGate:
+    # Cheap scene change detection on a tiny grayscale copy of the frame. As
+    # long as nothing moves and nobody was seen, face detection can be skipped.
+    width = 64
+    # pixels which changed by more than this are counted as moving
+    threshold = 20
+
+    def __init__(self, sensitivity=50, hold=5.0):
+        # sensitivity 1-100, the higher the fewer changed pixels are needed;
+        # hold is the number of seconds the scene counts as moving after the
+        # last motion
+        self.minChanged = (101 - sensitivity) / 1000.0
+        self.hold = hold
+        self.background = None
+        self.lastMotion = 0
+        self.frames = 0
+        self.gated = 0
+
+    def moving(self, frame):
+        # nearest neighbour is good enough and far cheaper on a full frame
+        (h, w) = frame.shape[:2]
+        small = cv2.resize(
+            frame,
+            (MotionGate.width, max(1, h * MotionGate.width // w)),
+            interpolation=cv2.INTER_NEAREST,
+        )
+        gray = cv2.GaussianBlur(cv2.cvtColor(small, cv2.COLOR_BGR2GRAY), (5, 5), 0)
+
+        if self.background is None:
+            self.background = gray.astype("float32")
+            self.lastMotion = time.time()
+            return True
+
+        # compare with a slowly adapting background, so lighting changes fade in
+        diff = cv2.absdiff(gray, cv2.convertScaleAbs(self.background))
+        changed = cv2.countNonZero(
+            cv2.threshold(diff, MotionGate.threshold, 255, cv2.THRESH_BINARY)[1]
+        )
+        cv2.accumulateWeighted(gray, self.background, 0.1)
+
+        if changed >= self.minChanged * gray.size:
+            self.lastMotion = time.time()
+        return self.recent()
+
+    def recent(self):
+        return time.time() - self.lastMotion < self.hold
+
+    def check(self, frame, facesPresent):
+        # True if the frame needs to be processed
+        self.frames += 1
+        if self.moving(frame) or facesPresent:
+            return True
+        self.gated += 1
+        return False
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "gated": round(self.gated / self.frames, 3) if self.frames > 0 else 0.0,
+        }
@@ -0,0 +1,374 @@
+import collections
+import threading
+import time
+from utils.metrics import NoMetrics
+
+
+class FrameJob:
+    # everything the stages know about one captured frame, handed from
+    # stage to stage through the queues
+    def __init__(self, originalFrame, camera=0, epoch=0):
+        self.captured = time.time()
+        # index of the camera the frame is coming from
+        self.camera = camera
+        # pauses of the pipeline before the frame was captured
+        self.epoch = epoch
+        self.originalFrame = originalFrame
+        # originalFrame with brightness, contrast and rotation applied
+        self.fullFrame = None
+        self.frame = None
+        self.rgb = None
+        self.boxes = []
+        self.encodings = []
+        # indexes of the faces encoded in this frame, the others are tracked
+        self.encoded = []
+        self.names = []
+        self.distances = []
+
+
+class FrameQueue:
+    # marker which is passed through all stages when the source is exhausted
+    END = object()
+
+    def __init__(self, maxsize=1, dropOldest=True):
+        self.items = collections.deque()
+        self.maxsize = maxsize
+        self.dropOldest = dropOldest
+        self.dropped = 0
+        self.closed = False
+        self.condition = threading.Condition()
+
+    def put(self, item):
+        with self.condition:
+            if item is not FrameQueue.END:
+                if self.dropOldest:
+                    # live frames get stale quickly, so we rather throw away
+                    # the oldest one than letting the producer wait
+                    while len(self.items) >= self.maxsize:
+                        self.items.popleft()
+                        self.dropped += 1
+                else:
+                    while len(self.items) >= self.maxsize and not self.closed:
+                        self.condition.wait()
+            self.items.append(item)
+            self.condition.notify_all()
+
+    def get(self, timeout=None):
+        # returns None if nothing arrived within the timeout
+        with self.condition:
+            if not self.condition.wait_for(
+                lambda: len(self.items) > 0 or self.closed, timeout
+            ):
+                return None
+            if len(self.items) == 0:
+                return FrameQueue.END
+            item = self.items.popleft()
+            self.condition.notify_all()
+            return item
+
+    def clear(self):
+        with self.condition:
+            self.items.clear()
+            self.condition.notify_all()
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def depth(self):
+        return len(self.items)
+
+
+class CameraQueue:
+    # Holds the captured frames of several cameras, each in a bounded queue of
+    # its own, and decides which camera is processed next: round robin, or
+    # weighted round robin by priority. A camera with priority p gets p + 1
+    # turns for every turn of a camera with priority 0 (negative priorities
+    # count as 0), but every camera with a frame waiting gets its turn, even
+    # if live cameras with a higher priority always have frames waiting.
+    def __init__(self, count, maxsize=1, dropOldest=True, priorities=None):
+        self.queues = [FrameQueue(maxsize, dropOldest) for _ in range(count)]
+        self.weights = None
+        if priorities is not None:
+            self.weights = [max(0, priority) + 1 for priority in priorities]
+        # smooth weighted round robin: every waiting camera gains its weight
+        # per turn, the one with the most credit is next and pays the total
+        self.credits = [0] * count
+        self.next = 0
+        self.finished = set()
+        self.condition = threading.Condition()
+        self.closed = False
+        for queue in self.queues:
+            # share one condition, so get() wakes up for every camera
+            queue.condition = self.condition
+
+    @property
+    def dropped(self):
+        return sum(queue.dropped for queue in self.queues)
+
+    def put(self, item, camera=0):
+        with self.condition:
+            if item is FrameQueue.END:
+                # every camera ends on its own, the stage only when all ended
+                self.finished.add(camera)
+                self.condition.notify_all()
+                return
+        self.queues[camera].put(item)
+
+    def ready(self):
+        return any(len(queue.items) > 0 for queue in self.queues)
+
+    def get(self, timeout=None):
+        with self.condition:
+            if not self.condition.wait_for(
+                lambda: self.ready()
+                or self.closed
+                or len(self.finished) == len(self.queues),
+                timeout,
+            ):
+                return None
+            if not self.ready():
+                return FrameQueue.END
+
+            waiting = [
+                (self.next + i) % len(self.queues)
+                for i in range(len(self.queues))
+                if len(self.queues[(self.next + i) % len(self.queues)].items) > 0
+            ]
+            if self.weights is not None:
+                for i in waiting:
+                    self.credits[i] += self.weights[i]
+                camera = max(waiting, key=lambda i: self.credits[i])
+                self.credits[camera] -= sum(self.weights[i] for i in waiting)
+            else:
+                camera = waiting[0]
+            self.next = camera + 1
+            item = self.queues[camera].items.popleft()
+            self.condition.notify_all()
+            return item
+
+    def clear(self):
+        for queue in self.queues:
+            queue.clear()
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            for queue in self.queues:
+                queue.closed = True
+            self.condition.notify_all()
+
+    def depth(self):
+        return sum(queue.depth() for queue in self.queues)
+
+
+class Pipeline:
+    # Runs capture and the processing stages on their own threads, connected
+    # by bounded queues. The loop period is bounded by the slowest stage
+    # instead of the sum of all stages.
+    # live cameras with a frame waiting only capture again this many seconds
+    # (at least) before the first stage takes its next frame
+    captureLead = 0.1
+    def __init__(
+        self, sources, stages, interval, queueSize=1, metrics=None, priorities=None
+    ):
+        # sources is a list of frame sources (cameras), stages is a list of
+        # (name, function) tuples, every function gets a FrameJob and returns
+        # it (or None to drop the frame); a stage (name, function, (size,
+        # wait)) gets a list of up to size jobs collected within wait seconds
+        # and returns a list; interval is a function returning the minimum
+        # seconds between two processed frames; with priorities (one per
+        # source) the cameras are not processed round robin
+        self.sources = sources
+        self.metrics = metrics if metrics is not None else NoMetrics()
+        self.stages = stages
+        self.interval = interval
+        self.running = threading.Event()
+        self.stopped = False
+        # counts the pauses, frames captured before the last one are stale
+        # and the stages start over when they see the first frame after it
+        self.epoch = 0
+        # time the first stage takes its next frame at the earliest
+        self.nextPull = 0.0
+        # an exception raised inside a stage, re-raised by get()
+        self.error = None
+
+        # replay sources must not lose frames, so we block instead of dropping
+        dropOldest = all(source.live for source in sources)
+        self.queues = collections.OrderedDict()
+        for i, stage in enumerate(stages):
+            # a batch stage needs enough frames waiting to fill a batch
+            size = max(queueSize, stage[2][0]) if len(stage) > 2 else queueSize
+            if i == 0:
+                self.queues[stage[0]] = CameraQueue(
+                    len(sources), size, dropOldest, priorities
+                )
+            else:
+                self.queues[stage[0]] = FrameQueue(size, dropOldest)
+        self.output = FrameQueue(queueSize, dropOldest)
+
+        self.threads = [
+            threading.Thread(target=self._capture, args=(i, source), daemon=True)
+            for i, source in enumerate(sources)
+        ]
+        targets = list(self.queues.values())[1:] + [self.output]
+        for i, stage in enumerate(stages):
+            self.threads.append(
+                threading.Thread(
+                    target=self._work,
+                    args=(
+                        stage[1],
+                        self.queues[stage[0]],
+                        targets[i],
+                        i == 0,
+                        stage[2] if len(stage) > 2 else None,
+                    ),
+                    daemon=True,
+                )
+            )
+
+    def start(self, paused=False):
+        # a paused pipeline leaves the sources off until resume()
+        if not paused:
+            self.running.set()
+        for thread in self.threads:
+            thread.start()
+
+    def pause(self):
+        # the capture thread stops the source, frames already queued or still
+        # in a stage are stale and dropped
+        self.running.clear()
+        self.epoch += 1
+        for queue in self.queues.values():
+            queue.clear()
+        self.output.clear()
+
+    def resume(self):
+        self.running.set()
+
+    def stop(self):
+        self.stopped = True
+        self.running.set()
+        for queue in self.queues.values():
+            queue.close()
+        self.output.close()
+        for thread in self.threads:
+            thread.join(timeout=2)
+
+    def get(self, timeout=None):
+        # next processed FrameJob, None on timeout or FrameQueue.END when
+        # the source is exhausted
+        job = self.output.get(timeout)
+        if job is FrameQueue.END and self.error is not None:
+            raise self.error
+        if isinstance(job, FrameJob) and not self.current(job):
+            return None
+        if isinstance(job, FrameJob):
+            # time from capturing the frame until it is ready for the events
+            self.metrics.record("latency", time.time() - job.captured)
+        return job
+
+    def current(self, job):
+        # whether the job was captured since the last pause
+        return job.epoch == self.epoch
+
+    def stats(self):
+        stats = collections.OrderedDict()
+        for name, queue in self.queues.items():
+            stats[name] = {"depth": queue.depth(), "dropped": queue.dropped}
+        stats["output"] = {"depth": self.output.depth(), "dropped": self.output.dropped}
+        return stats
+
+    def _capture(self, camera, source):
+        # the source is only touched from this thread, so start and stop
+        # cannot race with a pending read
+        firstQueue = next(iter(self.queues.values()))
+        lead = Pipeline.captureLead
+        lastCapture = 0.0
+        while not self.stopped:
+            if not self.running.is_set():
+                source.stop()
+                self.running.wait()
+                continue
+
+            # a live camera delivers far more frames than are processed, so
+            # while a frame is waiting we only capture a fresh one shortly
+            # before it is needed instead of copying every frame
+            if source.live and firstQueue.queues[camera].depth() > 0:
+                due = self.nextPull - lead
+                if time.time() < due or lastCapture >= due:
+                    time.sleep(min(max(due - time.time(), 0.01), 0.1))
+                    continue
+
+            source.start()
+            start = time.time()
+            lastCapture = start
+            epoch = self.epoch
+            with self.metrics.time("capture"):
+                frame = source.read()
+            # reading waits for the next frame of the camera, start early enough
+            lead = max(Pipeline.captureLead, 2 * (time.time() - start))
+            if frame is None:
+                firstQueue.put(FrameQueue.END, camera)
+                break
+            # a pause while reading makes the frame stale
+            if self.running.is_set() and epoch == self.epoch:
+                firstQueue.put(FrameJob(frame, camera, epoch), camera)
+        source.stop()
+
+    def _batch(self, queue, first, batch):
+        # collects more jobs until the batch is full or the wait is over
+        (size, wait) = batch
+        jobs = [first]
+        deadline = time.time() + wait
+        ended = False
+        while len(jobs) < size:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            job = queue.get(timeout=remaining)
+            if job is None:
+                break
+            if job is FrameQueue.END:
+                ended = True
+                break
+            if self.current(job):
+                jobs.append(job)
+        return jobs, ended
+
+    def _work(self, function, queue, target, paced, batch):
+        lastStart = 0
+        while not self.stopped:
+            if paced:
+                # wait for the interval first, so we pick up the freshest frame
+                time.sleep(max(0.0, lastStart + self.interval() - time.time()))
+
+            job = queue.get()
+            if job is FrameQueue.END:
+                target.put(FrameQueue.END)
+                break
+            if not self.current(job):
+                continue
+            lastStart = time.time()
+            if paced:
+                self.nextPull = lastStart + self.interval()
+
+            ended = False
+            try:
+                if batch is not None:
+                    (jobs, ended) = self._batch(queue, job, batch)
+                    jobs = function(jobs)
+                else:
+                    jobs = [function(job)]
+            except Exception as e:
+                # stop everything instead of silently losing the stage
+                self.error = e
+                self.output.close()
+                break
+            for job in jobs:
+                if job is not None and self.running.is_set() and self.current(job):
+                    target.put(job)
+            if ended:
+                target.put(FrameQueue.END)
+                break
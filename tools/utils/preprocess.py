@@ -0,0 +1,108 @@
+import cv2
+import numpy
+
+
+class Preprocessor:
+    # Prepares the captured frames for detection in one pass: the frame is
+    # resized first, so brightness/contrast (a lookup table), rotation and the
+    # conversion from the 4 channel camera format only touch the small image.
+    # Steps which would not change anything are skipped, and intermediate
+    # images are written into buffers which are reused for the next frame.
+    def __init__(self, brightness=0, contrast=0, rotation=-1):
+        self.lut = None
+        if float(brightness) != 0 or float(contrast) != 0:
+            # same as cv2.addWeighted with alpha = contrast and beta = brightness:
+            # float32 coefficients, the product added without rounding it
+            # first, then rounded to the nearest value (half to even) and
+            # saturated
+            alpha = numpy.float32(1 + float(contrast) / 100.0)
+            values = numpy.float32(
+                numpy.arange(256, dtype=numpy.float64) * alpha
+                + numpy.float32(brightness)
+            )
+            self.lut = numpy.clip(numpy.rint(values), 0, 255).astype(numpy.uint8)
+
+        # cv2.ROTATE_90_CLOCKWISE, ROTATE_180 or ROTATE_90_COUNTERCLOCKWISE
+        self.rotation = rotation if 0 <= rotation <= 2 else None
+        self.buffers = {}
+
+    def swapped(self):
+        # whether width and height change places with the rotation
+        return self.rotation in (
+            cv2.ROTATE_90_CLOCKWISE,
+            cv2.ROTATE_90_COUNTERCLOCKWISE,
+        )
+
+    def width(self, shape):
+        # width of the frame after the rotation
+        return shape[0] if self.swapped() else shape[1]
+
+    def size(self, shape, width):
+        # size to resize the unrotated frame to, so it is width pixels wide
+        # after the rotation; None if no resizing is needed
+        (h, w) = shape[:2]
+        swapped = self.swapped()
+        if width == 0 or width == (h if swapped else w):
+            return None
+        if swapped:
+            return (int(w * width / float(h)), width)
+        return (width, int(h * width / float(w)))
+
+    def steps(self, frame, width):
+        steps = []
+        size = self.size(frame.shape, width) if width is not None else None
+        if size is not None:
+            steps.append(
+                lambda src, dst: cv2.resize(
+                    src, size, dst=dst, interpolation=cv2.INTER_AREA
+                )
+            )
+        if frame.ndim == 3 and frame.shape[2] == 4:
+            # XRGB8888 from the camera is BGRA in memory
+            steps.append(lambda src, dst: cv2.cvtColor(src, cv2.COLOR_BGRA2BGR, dst=dst))
+        if self.lut is not None:
+            steps.append(lambda src, dst: cv2.LUT(src, self.lut, dst=dst))
+        if self.rotation is not None:
+            steps.append(lambda src, dst: cv2.rotate(src, self.rotation, dst=dst))
+        return steps
+
+    def process(self, frame, width=0):
+        # the small BGR frame for detection, width 0 keeps the size
+        steps = self.steps(frame, width)
+        for i, step in enumerate(steps):
+            if i == len(steps) - 1:
+                # the result is handed to the next stages, so it gets its own
+                # memory; OpenCV allocates a new buffer if the size changed
+                frame = step(frame, None)
+            else:
+                frame = step(frame, self.buffers.get(i))
+                self.buffers[i] = frame
+        return frame
+
+    def region(self, frame, box, scale, width):
+        # a window of the processed frame, (top, right, bottom, left) in its
+        # coordinates, cut from the captured frame (scale times larger after
+        # the rotation) and preprocessed to width pixels (None keeps the full
+        # resolution); only the window is touched, not the whole frame
+        (top, right, bottom, left) = [int(value * scale) for value in box]
+        (h, w) = frame.shape[:2]
+        # the window in the coordinates of the unrotated frame
+        if self.rotation == cv2.ROTATE_90_CLOCKWISE:
+            crop = frame[h - right : h - left, top:bottom]
+        elif self.rotation == cv2.ROTATE_180:
+            crop = frame[h - bottom : h - top, w - right : w - left]
+        elif self.rotation == cv2.ROTATE_90_COUNTERCLOCKWISE:
+            crop = frame[left:right, w - bottom : w - top]
+        else:
+            crop = frame[top:bottom, left:right]
+
+        for step in self.steps(crop, width):
+            crop = step(crop, None)
+        return crop
+
+    def full(self, frame):
+        # the full resolution frame (snapshots, encoding crops), only called if
+        # needed and never with reused buffers
+        for step in self.steps(frame, None):
+            frame = step(frame, None)
+        return frame
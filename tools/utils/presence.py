@@ -0,0 +1,61 @@
+import collections
+
+
+class Presence:
+    # Decides who is in front of the mirror from the names of several frames
+    # instead of a single one, so one misrecognized frame neither logs
+    # somebody in nor out: a person logs in after being seen in enterFrames
+    # of the last window frames and logs out after exitFrames frames in a
+    # row without them.
+    def __init__(self, enterFrames=1, window=1, exitFrames=1):
+        self.enterFrames = max(1, enterFrames)
+        self.window = max(self.enterFrames, window)
+        self.exitFrames = max(1, exitFrames)
+        # per name whether it was seen in the last window frames
+        self.history = {}
+        self.absent = {}
+        self.present = []
+
+    def update(self, names):
+        # called with the names of every processed frame, returns the names
+        # which logged in and out with it
+        seen = set(names)
+        for name in seen:
+            if name is not None and name not in self.history:
+                self.history[name] = collections.deque(maxlen=self.window)
+                self.absent[name] = 0
+
+        logins = []
+        logouts = []
+        for name in list(self.history):
+            self.history[name].append(name in seen)
+            self.absent[name] = 0 if name in seen else self.absent[name] + 1
+
+            if name not in self.present:
+                if sum(self.history[name]) >= self.enterFrames:
+                    self.present.append(name)
+                    logins.append(name)
+            elif self.absent[name] >= self.exitFrames:
+                self.present.remove(name)
+                logouts.append(name)
+
+            # forget the names which are neither present nor seen anymore
+            if name not in self.present and not any(self.history[name]):
+                del self.history[name]
+                del self.absent[name]
+        return logins, logouts
+
+    def confidence(self, name):
+        # share of the last window frames the name was seen in
+        history = self.history.get(name)
+        if not history:
+            return 0.0
+        return sum(history) / float(self.window)
+
+    def reset(self):
+        # forgets everything, returns the names which were present
+        present = self.present
+        self.history = {}
+        self.absent = {}
+        self.present = []
+        return present
@@ -0,0 +1,83 @@
+import base64
+import cv2
+import os
+import threading
+import time
+from utils.image import Image
+from utils.pipeline import FrameQueue
+from utils.print import Print
+
+
+class Preview:
+    # Sends the processed frames to the mirror. Frames are scaled, JPEG
+    # encoded and sent on a background thread with a limited frame rate;
+    # frames arriving while the previous one is still being sent are skipped.
+    # With a file the JPEG is written there (e.g. to /dev/shm) and only a
+    # short notice goes through the JSON channel, instead of the base64 data.
+    def __init__(self, width=0, quality=80, maxFps=5, path=""):
+        self.width = width
+        self.quality = quality
+        self.minPeriod = 1.0 / maxFps if maxFps > 0 else 0.0
+        self.path = path
+        self.slot = FrameQueue(1)
+        self.lastSubmit = 0
+        self.sent = 0
+        self.skipped = 0
+        self.failed = 0
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def submit(self, frame):
+        if time.time() - self.lastSubmit < self.minPeriod:
+            self.skipped += 1
+            return
+        self.lastSubmit = time.time()
+        self.slot.put(frame)
+
+    def stats(self):
+        return {
+            "sent": self.sent,
+            "skipped": self.skipped + self.slot.dropped,
+            "failed": self.failed,
+        }
+
+    def _run(self):
+        sequence = 0
+        failing = False
+        while True:
+            frame = self.slot.get()
+            if frame is None or frame is FrameQueue.END:
+                continue
+
+            try:
+                if self.width != 0 and self.width < frame.shape[1]:
+                    frame = Image.resize(frame, width=self.width)
+                (_, buffer) = cv2.imencode(
+                    ".jpg", frame, [int(cv2.IMWRITE_JPEG_QUALITY), self.quality]
+                )
+                sequence += 1
+
+                if self.path:
+                    # replace the file in one step, so it is never read half
+                    # written
+                    temporaryPath = self.path + ".tmp"
+                    with open(temporaryPath, "wb") as f:
+                        f.write(buffer.tobytes())
+                    os.replace(temporaryPath, self.path)
+                    Print.printJson(
+                        "camera_image", {"file": self.path, "sequence": sequence}
+                    )
+                else:
+                    Print.printJson(
+                        "camera_image", {"image": base64.b64encode(buffer).decode()}
+                    )
+                self.sent += 1
+                failing = False
+            except Exception as e:
+                # e.g. the folder of previewFile is missing or the disk is
+                # full; reported once until it works again
+                self.failed += 1
+                if not failing:
+                    Print.printJson("status", "sending preview failed: {}".format(e))
+                failing = True
@@ -1,8 +1,70 @@
+import contextlib
 import json
 import sys
+import threading
+import time
 
 
 class Print:
+    # Messages to node_helper.js, one JSON object per line:
+    #
+    #   {"v": 2, "seq": 12, "ts": 1700000000.123, "kind": "event",
+    #    "type": "login", "data": {...}, "captured": 1700000000.051}
+    #
+    # seq counts every message, so lost lines can be noticed, ts is the time
+    # the message was written and captured the time the frame it is about
+    # was taken (end-to-end latency). Messages of one frame can be collected
+    # with batch() and are written together.
+    version = 2
+    kinds = {
+        "login": "event",
+        "logout": "event",
+        "camera_image": "preview",
+        "metrics": "metrics",
+    }
+    # messages are printed from several threads, the lock keeps the lines intact
+    lock = threading.Lock()
+    sequence = 0
+    batches = threading.local()
+
     def printJson(type, message):
-        print(json.dumps({type: message}))
-        sys.stdout.flush()
+        entry = {
+            "kind": Print.kinds.get(type, "status"),
+            "type": type,
+            "data": message,
+        }
+        pending = getattr(Print.batches, "pending", None)
+        if pending is not None:
+            pending.append(entry)
+        else:
+            Print.write([entry], None)
+
+    @contextlib.contextmanager
+    def batch(captured=None):
+        # everything printed by this thread within the block is written at the
+        # end in one go, tagged with the capture time of the frame
+        Print.batches.pending = []
+        try:
+            yield
+        finally:
+            pending = Print.batches.pending
+            Print.batches.pending = None
+            if len(pending) > 0:
+                Print.write(pending, captured)
+
+    def write(entries, captured):
+        with Print.lock:
+            lines = []
+            for entry in entries:
+                Print.sequence += 1
+                message = {
+                    "v": Print.version,
+                    "seq": Print.sequence,
+                    "ts": time.time(),
+                }
+                message.update(entry)
+                if captured is not None:
+                    message["captured"] = captured
+                lines.append(json.dumps(message))
+            sys.stdout.write("\n".join(lines) + "\n")
+            sys.stdout.flush()
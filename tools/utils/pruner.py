@@ -0,0 +1,99 @@
+import numpy
+
+
+class Pruner:
+    # Reduces the encodings of every person: near-duplicates (e.g. snapshots
+    # of consecutive frames) are dropped, encodings which are closer to the
+    # mean encoding of another person are flagged as outliers (probably
+    # mislabeled), and optionally every person is clustered down to a few
+    # prototypes. All functions work on a float32 matrix and a name list and
+    # return row indexes, so the result can be applied to the store.
+
+    def distances(a, b):
+        # euclidean distances of all rows of a to all rows of b
+        squared = (
+            numpy.einsum("ij,ij->i", a, a)[:, None]
+            + numpy.einsum("ij,ij->i", b, b)[None, :]
+            - 2.0 * (a @ b.T)
+        )
+        return numpy.sqrt(numpy.maximum(squared, 0.0))
+
+    def people(names):
+        # row indexes of every person
+        people = {}
+        for i, name in enumerate(names):
+            people.setdefault(name, []).append(i)
+        return {name: numpy.array(rows) for name, rows in people.items()}
+
+    def outliers(encodings, names):
+        # rows whose own mean encoding is farther away than the one of
+        # another person
+        people = Pruner.people(names)
+        if len(people) < 2:
+            return []
+        order = sorted(people)
+        centroids = numpy.stack(
+            [encodings[people[name]].mean(axis=0) for name in order]
+        )
+        closest = numpy.argmin(Pruner.distances(encodings, centroids), axis=1)
+        return [i for i, name in enumerate(names) if order[closest[i]] != name]
+
+    def duplicates(encodings, rows, distance):
+        # keeps the first of every group of encodings closer than distance,
+        # returns the rows to keep
+        keep = []
+        for row in rows:
+            if len(keep) > 0:
+                nearest = Pruner.distances(encodings[[row]], encodings[keep]).min()
+                if nearest < distance:
+                    continue
+            keep.append(row)
+        return keep
+
+    def prototypes(encodings, rows, count, seed=0, iterations=20):
+        # k-means with count clusters over the rows, returns the row closest
+        # to every cluster center (real encodings, so the source image of
+        # every prototype stays known)
+        rows = numpy.asarray(rows)
+        if count <= 0 or len(rows) <= count:
+            return list(rows)
+
+        points = encodings[rows]
+        random = numpy.random.default_rng(seed)
+        centers = points[random.choice(len(points), count, replace=False)]
+        for _ in range(iterations):
+            assignment = numpy.argmin(Pruner.distances(points, centers), axis=1)
+            for k in range(count):
+                members = points[assignment == k]
+                if len(members) > 0:
+                    centers[k] = members.mean(axis=0)
+
+        closest = numpy.argmin(Pruner.distances(centers, points), axis=1)
+        return sorted(set(rows[closest].tolist()))
+
+    def reduce(
+        encodings, names, duplicateDistance, prototypes, removeOutliers, seed=0
+    ):
+        # returns the rows to keep and the flagged outliers
+        outliers = Pruner.outliers(encodings, names)
+        excluded = set(outliers) if removeOutliers else set()
+        keep = []
+        for name, rows in Pruner.people(names).items():
+            rows = [row for row in rows if row not in excluded]
+            if duplicateDistance > 0:
+                rows = Pruner.duplicates(encodings, rows, duplicateDistance)
+            keep.extend(Pruner.prototypes(encodings, rows, prototypes, seed))
+        return sorted(keep), outliers
+
+    def split(names, holdout, seed=0):
+        # training and held-out rows, every person keeps at least one
+        # encoding for training
+        random = numpy.random.default_rng(seed)
+        train = []
+        test = []
+        for rows in Pruner.people(names).values():
+            rows = random.permutation(rows)
+            count = min(len(rows) - 1, int(round(len(rows) * holdout)))
+            test.extend(rows[:count].tolist())
+            train.extend(rows[count:].tolist())
+        return sorted(train), sorted(test)
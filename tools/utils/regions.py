@@ -0,0 +1,98 @@
+from utils.tracker import Tracker
+
+
+class RegionSearch:
+    # Searches for faces only in windows around the faces of the last frame
+    # instead of the whole frame. The windows are cut from the captured full
+    # resolution frame, preprocessed on their own and scaled so the face has
+    # about faceSize pixels, which is cheaper
+    # than the full frame for faces close to the mirror and more detailed for
+    # faces far away. The whole frame is still searched every fullScanEvery
+    # frames (to find new faces) and whenever a window is empty.
+    # margin around the last box in box widths / heights
+    margin = 0.5
+
+    def __init__(self, faceSize=120, fullScanEvery=10):
+        self.faceSize = faceSize
+        self.fullScanEvery = fullScanEvery
+        self.boxes = []
+        self.sinceFullScan = 0
+        self.hits = 0
+        self.misses = 0
+        self.fullScans = 0
+
+    def due(self):
+        # whether the next frame has to be searched completely
+        return len(self.boxes) == 0 or self.sinceFullScan >= self.fullScanEvery
+
+    def windows(self, shape):
+        # (window, face width) for every face of the last frame, in the
+        # coordinates of the processed frame
+        (height, width) = shape[:2]
+        windows = []
+        for top, right, bottom, left in self.boxes:
+            dx = int((right - left) * RegionSearch.margin)
+            dy = int((bottom - top) * RegionSearch.margin)
+            windows.append(
+                (
+                    (
+                        max(0, top - dy),
+                        min(width, right + dx),
+                        min(height, bottom + dy),
+                        max(0, left - dx),
+                    ),
+                    right - left,
+                )
+            )
+        return windows
+
+    def search(self, detector, frame, originalFrame, preprocessor):
+        # boxes of the faces in the processed frame, or None if a window was
+        # empty and the whole frame has to be searched
+        scale = preprocessor.width(originalFrame.shape) / frame.shape[1]
+        boxes = []
+        for window, faceWidth in self.windows(frame.shape):
+            (top, right, bottom, left) = window
+            # zoom relative to the processed frame, at most full resolution
+            zoom = min(scale, self.faceSize / max(faceWidth, 1))
+            crop = preprocessor.region(
+                originalFrame, window, scale, max(1, int((right - left) * zoom))
+            )
+            if crop.shape[0] == 0 or crop.shape[1] == 0:
+                self.misses += 1
+                return None
+            # the zoom after rounding to whole pixels
+            zoom = crop.shape[1] / float(right - left)
+
+            (_, found) = detector.detect(crop)
+            if len(found) == 0:
+                self.misses += 1
+                return None
+            for t, r, b, l in found:
+                box = (
+                    int(top + t / zoom),
+                    int(left + r / zoom),
+                    int(top + b / zoom),
+                    int(left + l / zoom),
+                )
+                # windows of faces next to each other overlap
+                if all(Tracker.overlap(box, other) < 0.5 for other in boxes):
+                    boxes.append(box)
+
+        self.hits += 1
+        return boxes
+
+    def update(self, boxes, fullScan):
+        self.boxes = boxes
+        if fullScan:
+            self.fullScans += 1
+            self.sinceFullScan = 0
+        else:
+            self.sinceFullScan += 1
+
+    def reset(self):
+        self.boxes = []
+        self.sinceFullScan = 0
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "fullScans": self.fullScans}
@@ -0,0 +1,53 @@
+import os
+import threading
+from utils.print import Print
+
+
+class Reloader:
+    # Keeps an object which is built from a file (e.g. the matcher from the
+    # encodings) up to date. The file is rebuilt on a background thread when
+    # it changes on disk or a reload is requested, and swapped in as a whole,
+    # so readers always see either the old or the new object.
+    def __init__(self, path, load, interval=5):
+        # load gets the path and returns the new object, interval is the
+        # number of seconds between two checks of the file (0 = no watching)
+        self.path = path
+        self.load = load
+        self.interval = interval
+        self.requested = threading.Event()
+        self.signature = self.stat()
+        self.current = load(path)
+
+    def stat(self):
+        # encode.py replaces the file, so inode, size and mtime all change
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def start(self):
+        threading.Thread(target=self._watch, daemon=True).start()
+
+    def request(self):
+        self.requested.set()
+
+    def _watch(self):
+        while True:
+            self.requested.wait(self.interval if self.interval > 0 else None)
+            forced = self.requested.is_set()
+            self.requested.clear()
+
+            signature = self.stat()
+            if signature is None or (signature == self.signature and not forced):
+                continue
+
+            try:
+                current = self.load(self.path)
+            except Exception as e:
+                # keep the old object, the file may be written right now
+                Print.printJson("status", "reloading {} failed: {}".format(self.path, e))
+                continue
+            self.signature = signature
+            self.current = current
+            Print.printJson("status", "reloaded {}".format(self.path))
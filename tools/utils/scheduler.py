@@ -0,0 +1,63 @@
+import time
+
+
+class Scheduler:
+    # Adapts detection interval and processing width at runtime: fast and
+    # detailed while faces are in front of the mirror (or were just lost),
+    # backing off exponentially to slow and small while nobody is there.
+    backoff = 2.0
+
+    def __init__(self, intervalBounds, widthBounds, linger=10.0):
+        # bounds are (min, max) tuples, interval in seconds, width in pixels;
+        # linger is the number of seconds after the last face we stay fast
+        (self.minInterval, self.maxInterval) = intervalBounds
+        (self.minWidth, self.maxWidth) = widthBounds
+        self.linger = linger
+        self.lastFace = time.time()
+        self.interval = self.minInterval
+        self.width = self.maxWidth
+
+    def update(self, facesPresent):
+        # called after every detection
+        if facesPresent:
+            self.lastFace = time.time()
+
+        if time.time() - self.lastFace < self.linger:
+            self.interval = self.minInterval
+            self.width = self.maxWidth
+        else:
+            self.interval = min(
+                self.maxInterval, max(self.interval, 0.001) * Scheduler.backoff
+            )
+            self.width = self.minWidth
+
+    def configure(self, interval=None, width=None):
+        # changes the settings at runtime: fixed values are replaced, with
+        # adaptive bounds the fast end (short interval, large width) is
+        # changed
+        if interval is not None:
+            if self.minInterval == self.maxInterval:
+                self.maxInterval = interval
+            self.minInterval = interval
+            self.maxInterval = max(self.maxInterval, interval)
+            self.interval = min(max(self.interval, self.minInterval), self.maxInterval)
+        if width is not None:
+            if self.minWidth == self.maxWidth:
+                self.minWidth = width
+            self.maxWidth = width
+            self.minWidth = min(self.minWidth, width)
+            self.width = min(max(self.width, self.minWidth), self.maxWidth)
+
+    def reset(self):
+        # start fast again, e.g. when the recognition is resumed after a pause
+        self.lastFace = time.time()
+        self.interval = self.minInterval
+        self.width = self.maxWidth
+
+    def stats(self):
+        return {"interval": int(self.interval * 1000), "processWidth": self.width}
+
+    def parse_bounds(value):
+        # "min,max" from the command line
+        (low, high) = value.split(",")
+        return (int(low), int(high))
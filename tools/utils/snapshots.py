@@ -0,0 +1,142 @@
+import cv2
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from utils.pipeline import FrameQueue
+from utils.print import Print
+from utils.store import EncodingStore
+
+
+class Snapshots:
+    # Saves frames of logged in persons to the dataset (extendDataset) along
+    # with the face boxes and encodings the recognizer already computed. They
+    # are stored in a cache keyed by the hash of the image file, where
+    # encode.py picks them up instead of encoding the snapshot again.
+    cacheFolder = ".cache"
+    # file name of a snapshot after the name of the person
+    pattern = r"_\d{8}_\d{6}\.jpg$"
+
+    def __init__(self, dataset, maxPerPerson=0, minInterval=0, queueSize=4):
+        # maxPerPerson limits the number of snapshots kept per person, the
+        # oldest are deleted first (0 = unlimited); minInterval is the number
+        # of seconds between two snapshots of the same person
+        self.dataset = dataset
+        self.maxPerPerson = maxPerPerson
+        self.minInterval = minInterval
+        self.cache = os.path.join(dataset, Snapshots.cacheFolder)
+        os.makedirs(self.cache, exist_ok=True)
+
+        # a slow SD card must not delay the login messages, so the snapshots
+        # are written on a background thread; if it falls behind, the oldest
+        # pending snapshots are dropped
+        self.queue = FrameQueue(queueSize)
+        self.lastSaved = {}
+        self.written = 0
+        self.limited = 0
+
+    def start(self):
+        threading.Thread(target=self._write, daemon=True).start()
+
+    def submit(self, name, prepare):
+        # prepare returns the frame, boxes and encodings to save, it is called
+        # on the writer thread as preparing the full frame takes time as well
+        if time.time() - self.lastSaved.get(name, 0) < self.minInterval:
+            self.limited += 1
+            return
+        self.lastSaved[name] = time.time()
+        self.queue.put((name, prepare))
+
+    def stats(self):
+        return {
+            "pending": self.queue.depth(),
+            "dropped": self.queue.dropped,
+            "rateLimited": self.limited,
+            "written": self.written,
+        }
+
+    def _write(self):
+        while True:
+            (name, prepare) = self.queue.get()
+            try:
+                self.save(name, *prepare())
+                self.written += 1
+            except Exception as e:
+                Print.printJson("status", "saving snapshot of {} failed: {}".format(name, e))
+
+    def cache_path(dataset, digest):
+        return os.path.join(dataset, Snapshots.cacheFolder, digest + ".json")
+
+    def load(dataset, digest):
+        # boxes and encodings of a cached image, None if there are none
+        try:
+            with open(Snapshots.cache_path(dataset, digest)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, name, frame, boxes, encodings):
+        # boxes are in the coordinates of the frame, encodings None if the
+        # picture has to be encoded by encode.py; the entry is written anyway,
+        # it marks the picture as a snapshot for evict()
+        path = os.path.join(self.dataset, name)
+        os.makedirs(path, exist_ok=True)
+        imagePath = os.path.join(
+            path, name + "_" + datetime.now().strftime("%Y%m%d_%H%M%S") + ".jpg"
+        )
+
+        # encode in memory first, the hash has to match the file content
+        (_, buffer) = cv2.imencode(".jpg", frame)
+        data = buffer.tobytes()
+        with open(imagePath, "wb") as f:
+            f.write(data)
+
+        entry = {
+            "image": imagePath,
+            "boxes": [[int(value) for value in box] for box in boxes],
+            "encodings": None,
+        }
+        if encodings is not None:
+            entry["encodings"] = [
+                [float(value) for value in encoding] for encoding in encodings
+            ]
+        with open(
+            Snapshots.cache_path(self.dataset, hashlib.sha1(data).hexdigest()), "w"
+        ) as f:
+            json.dump(entry, f)
+
+        self.evict(path, name)
+        return imagePath
+
+    def evict(self, path, name):
+        if self.maxPerPerson <= 0:
+            return
+
+        # only snapshots taken by the recognizer, never the images of the user:
+        # the file name has to be the one save() gives it, and the cache needs
+        # an entry for exactly this file; the timestamp sorts them by age
+        pattern = re.compile("^" + re.escape(name) + Snapshots.pattern)
+        snapshots = []
+        for filename in sorted(os.listdir(path)):
+            if not pattern.search(filename):
+                continue
+            imagePath = os.path.join(path, filename)
+            try:
+                digest = EncodingStore.hash(imagePath)
+            except OSError:
+                continue
+            entry = Snapshots.load(self.dataset, digest)
+            if entry is not None and entry.get("image") == imagePath:
+                cachePath = Snapshots.cache_path(self.dataset, digest)
+                snapshots.append((imagePath, cachePath))
+
+        excess = max(0, len(snapshots) - self.maxPerPerson)
+        for imagePath, cachePath in snapshots[:excess]:
+            try:
+                os.remove(imagePath)
+                os.remove(cachePath)
+            except OSError:
+                pass
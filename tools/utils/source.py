@@ -0,0 +1,129 @@
+import cv2
+import os
+from utils.image import Image
+
+
+class FrameSource:
+    # Every source has read(), which returns the next frame or None if the
+    # source is exhausted. live sources (cameras) keep running on their own
+    # and frames which are not picked up in time are lost, replay sources
+    # only advance when read
+    live = True
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def close(self):
+        self.stop()
+
+    def create(spec, resolution, loop=False):
+        # the source is given as "<type>[:<argument>]", e.g. "picamera:1",
+        # "opencv:0", "images:../replay/" or "video:../replay/hallway.mp4"
+        (kind, _, argument) = spec.partition(":")
+
+        if kind == "picamera":
+            return PiCameraSource(resolution, int(argument or 0))
+        elif kind == "opencv":
+            return VideoCaptureSource(int(argument or 0), resolution)
+        elif kind == "images":
+            return ImageFolderSource(argument, loop=loop)
+        elif kind == "video":
+            return VideoFileSource(argument, loop=loop)
+
+        raise ValueError("unknown frame source: " + spec)
+
+
+class PiCameraSource(FrameSource):
+    def __init__(self, resolution, number=0):
+        # picamera2 is only available on a Raspberry Pi, so we import it only
+        # if the camera is really used
+        from picamera2 import Picamera2
+
+        self.camera = Picamera2(number)
+        self.camera.configure(
+            self.camera.create_preview_configuration(
+                main={"size": (resolution[0], resolution[1]), "format": "XRGB8888"}
+            )
+        )
+        self.running = False
+
+    def start(self):
+        if not self.running:
+            self.camera.start()
+            self.running = True
+
+    def stop(self):
+        if self.running:
+            self.camera.stop()
+            self.running = False
+
+    def read(self):
+        return self.camera.capture_array()
+
+
+class VideoCaptureSource(FrameSource):
+    def __init__(self, device, resolution):
+        self.device = device
+        self.resolution = resolution
+        self.capture = None
+
+    def start(self):
+        if self.capture is None:
+            self.capture = cv2.VideoCapture(self.device)
+            self.capture.set(cv2.CAP_PROP_FRAME_WIDTH, self.resolution[0])
+            self.capture.set(cv2.CAP_PROP_FRAME_HEIGHT, self.resolution[1])
+
+    def stop(self):
+        if self.capture is not None:
+            self.capture.release()
+            self.capture = None
+
+    def read(self):
+        (grabbed, frame) = self.capture.read()
+        return frame if grabbed else None
+
+
+class ImageFolderSource(FrameSource):
+    live = False
+
+    def __init__(self, path, loop=False):
+        self.imagePaths = sorted(Image.list_images(path))
+        if len(self.imagePaths) == 0:
+            raise ValueError("no images found in " + path)
+        self.loop = loop
+        self.position = 0
+
+    def read(self):
+        if self.position >= len(self.imagePaths):
+            if not self.loop:
+                return None
+            self.position = 0
+
+        frame = cv2.imread(self.imagePaths[self.position])
+        self.position += 1
+        return frame
+
+
+class VideoFileSource(FrameSource):
+    live = False
+
+    def __init__(self, path, loop=False):
+        if not os.path.isfile(path):
+            raise ValueError("video file not found: " + path)
+        self.path = path
+        self.loop = loop
+        self.capture = cv2.VideoCapture(path)
+
+    def read(self):
+        (grabbed, frame) = self.capture.read()
+        if not grabbed and self.loop:
+            # rewind and try again from the first frame
+            self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            (grabbed, frame) = self.capture.read()
+        return frame if grabbed else None
+
+    def close(self):
+        self.capture.release()
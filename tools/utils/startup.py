@@ -0,0 +1,47 @@
+import collections
+import contextlib
+import threading
+import time
+
+
+class Startup:
+    # Measures how long the phases of the startup take. Phases can run in the
+    # background, e.g. loading the models while the cameras are initialised.
+    def __init__(self):
+        self.started = time.time()
+        self.phases = collections.OrderedDict()
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        start = time.time()
+        yield
+        self.phases[name] = time.time() - start
+
+    def background(self, name, function):
+        # runs the function on its own thread, join() waits for it and
+        # returns its result (or raises its exception)
+        result = {}
+
+        def run():
+            try:
+                with self.phase(name):
+                    result["value"] = function()
+            except Exception as e:
+                result["error"] = e
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+
+        def join():
+            thread.join()
+            if "error" in result:
+                raise result["error"]
+            return result["value"]
+
+        return join
+
+    def report(self):
+        # milliseconds per phase and in total
+        report = {name: int(seconds * 1000) for name, seconds in self.phases.items()}
+        report["total"] = int((time.time() - self.started) * 1000)
+        return report
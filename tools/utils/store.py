@@ -0,0 +1,141 @@
+import hashlib
+import json
+import numpy
+import os
+import pickle
+import struct
+
+
+class EncodingStore:
+    # Versioned binary file with all known encodings:
+    #
+    #   magic "FRDB", uint32 version, uint64 header length, JSON header,
+    #   padding, float32 encodings (count x 128), int32 labels (index into
+    #   the people list), int32 images (index into the image metadata)
+    #
+    # The arrays are aligned, so they can be memory-mapped instead of read.
+    magic = b"FRDB"
+    version = 1
+    dimensions = 128
+    alignment = 64
+
+    def __init__(self, encodings, names, images=None, imageIndex=None):
+        # images is a list of metadata dicts (path, mtime, ...) of the images
+        # the encodings were computed from, imageIndex maps every encoding to
+        # one of them (-1 if unknown)
+        self.encodings = numpy.asarray(encodings, dtype=numpy.float32).reshape(
+            -1, EncodingStore.dimensions
+        )
+        self.names = list(names)
+        self.images = list(images) if images is not None else []
+        if imageIndex is None:
+            imageIndex = numpy.full(len(self.names), -1, dtype=numpy.int32)
+        self.imageIndex = numpy.asarray(imageIndex, dtype=numpy.int32)
+
+    def __len__(self):
+        return len(self.names)
+
+    def load(path, mmap=True):
+        # reads the binary format, or the pickle written by older versions
+        with open(path, "rb") as f:
+            if f.read(len(EncodingStore.magic)) != EncodingStore.magic:
+                f.seek(0)
+                data = pickle.loads(f.read())
+                return EncodingStore(data["encodings"], data["names"])
+
+            (version, headerLength) = struct.unpack("<IQ", f.read(12))
+            if version > EncodingStore.version:
+                raise ValueError(
+                    "encodings file version {} is not supported".format(version)
+                )
+            header = json.loads(f.read(headerLength).decode("utf-8"))
+
+        count = header["count"]
+        arrays = {}
+        for name, dtype, shape in (
+            ("encodings", numpy.float32, (count, EncodingStore.dimensions)),
+            ("labels", numpy.int32, (count,)),
+            ("images", numpy.int32, (count,)),
+        ):
+            if count == 0:
+                arrays[name] = numpy.zeros(shape, dtype=dtype)
+            elif mmap:
+                arrays[name] = numpy.memmap(
+                    path, dtype=dtype, mode="r", offset=header["offsets"][name], shape=shape
+                )
+            else:
+                arrays[name] = numpy.fromfile(
+                    path, dtype=dtype, count=int(numpy.prod(shape)), offset=header["offsets"][name]
+                ).reshape(shape)
+
+        people = header["people"]
+        store = EncodingStore.__new__(EncodingStore)
+        store.encodings = arrays["encodings"]
+        store.names = [people[label] for label in arrays["labels"]]
+        store.images = header["images"]
+        store.imageIndex = arrays["images"]
+        return store
+
+    def save(self, path):
+        people = sorted(set(self.names))
+        index = {name: i for i, name in enumerate(people)}
+        labels = numpy.array([index[name] for name in self.names], dtype=numpy.int32)
+        arrays = (
+            ("encodings", numpy.ascontiguousarray(self.encodings, dtype=numpy.float32)),
+            ("labels", labels),
+            ("images", numpy.ascontiguousarray(self.imageIndex, dtype=numpy.int32)),
+        )
+
+        # the header contains the offsets of the arrays, which depend on the
+        # header length, so we reserve enough room for the offset digits
+        header = {
+            "count": len(self.names),
+            "people": people,
+            "images": self.images,
+            "offsets": {name: 10**15 for name, _ in arrays},
+        }
+        start = EncodingStore.align(
+            16 + len(json.dumps(header).encode("utf-8"))
+        )
+        offset = start
+        for name, array in arrays:
+            header["offsets"][name] = offset
+            offset = EncodingStore.align(offset + array.nbytes)
+        encodedHeader = json.dumps(header).encode("utf-8")
+        encodedHeader += b" " * (start - 16 - len(encodedHeader))
+
+        # write to a temporary file first, so a running recognizer never sees
+        # a half written file
+        temporaryPath = path + ".tmp"
+        with open(temporaryPath, "wb") as f:
+            f.write(EncodingStore.magic)
+            f.write(struct.pack("<IQ", EncodingStore.version, len(encodedHeader)))
+            f.write(encodedHeader)
+            for name, array in arrays:
+                f.seek(header["offsets"][name])
+                f.write(array.tobytes())
+        os.replace(temporaryPath, path)
+
+    def align(offset):
+        return -(-offset // EncodingStore.alignment) * EncodingStore.alignment
+
+    def describe(path):
+        # manifest entry of an image, the content hash is only added on demand
+        # because it needs to read the whole file
+        stat = os.stat(path)
+        return {"path": path, "size": stat.st_size, "mtime": stat.st_mtime}
+
+    def hash(path):
+        digest = hashlib.sha1()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def by_image(self):
+        # encodings of every image in the manifest, keyed by image path
+        result = {image["path"]: [] for image in self.images}
+        for encoding, image in zip(self.encodings, self.imageIndex):
+            if image >= 0:
+                result[self.images[image]["path"]].append(encoding)
+        return result
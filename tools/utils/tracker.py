@@ -0,0 +1,97 @@
+import itertools
+
+
+class Track:
+    def __init__(self, trackId, box):
+        self.id = trackId
+        self.box = box
+        self.name = None
+        self.distance = 1.0
+        self.encoding = None
+        # frames since the face was encoded, and since it was last seen
+        self.age = 0
+        self.missed = 0
+        self.overlap = 1.0
+
+
+class Tracker:
+    # Associates the face boxes of consecutive frames, so the identity of a
+    # face standing in front of the mirror is carried forward and the
+    # expensive encoding is only repeated every few frames.
+    minOverlap = 0.3
+    # a track which moved more than this (IoU with its last box) is re-encoded
+    reencodeOverlap = 0.5
+    # matches this close to the tolerance are re-encoded every frame
+    margin = 0.05
+
+    def __init__(self, encodeEvery=5, maxMissed=1):
+        self.encodeEvery = encodeEvery
+        self.maxMissed = maxMissed
+        self.tracks = []
+        self.ids = itertools.count(1)
+
+    def overlap(a, b):
+        # intersection over union of two (top, right, bottom, left) boxes
+        (top, right) = (max(a[0], b[0]), min(a[1], b[1]))
+        (bottom, left) = (min(a[2], b[2]), max(a[3], b[3]))
+        intersection = max(0, right - left) * max(0, bottom - top)
+        union = (
+            (a[1] - a[3]) * (a[2] - a[0]) + (b[1] - b[3]) * (b[2] - b[0]) - intersection
+        )
+        return intersection / union if union > 0 else 0.0
+
+    def close(a, b):
+        # centroid association for fast moving faces without overlap
+        dx = (a[1] + a[3]) / 2 - (b[1] + b[3]) / 2
+        dy = (a[0] + a[2]) / 2 - (b[0] + b[2]) / 2
+        return (dx * dx + dy * dy) ** 0.5 < (b[1] - b[3]) / 2
+
+    def update(self, boxes):
+        # returns the track of every box, in the order of the boxes
+        pairs = []
+        for i, box in enumerate(boxes):
+            for track in self.tracks:
+                score = Tracker.overlap(box, track.box)
+                if score >= Tracker.minOverlap or Tracker.close(box, track.box):
+                    pairs.append((score, i, track))
+
+        # greedy assignment, best overlapping pairs first
+        result = [None] * len(boxes)
+        assigned = set()
+        for score, i, track in sorted(pairs, key=lambda pair: -pair[0]):
+            if result[i] is None and track.id not in assigned:
+                result[i] = track
+                assigned.add(track.id)
+                track.overlap = score
+                track.box = boxes[i]
+                track.missed = 0
+                track.age += 1
+
+        # everything else is lost for a moment or a new face
+        for track in self.tracks:
+            if track.id not in assigned:
+                track.missed += 1
+        self.tracks = [track for track in self.tracks if track.missed <= self.maxMissed]
+        for i, box in enumerate(boxes):
+            if result[i] is None:
+                result[i] = Track(next(self.ids), box)
+                self.tracks.append(result[i])
+
+        return result
+
+    def needs_encoding(self, track, tolerance):
+        return (
+            track.name is None
+            or track.age >= self.encodeEvery
+            or track.overlap < Tracker.reencodeOverlap
+            or (track.name != "unknown" and tolerance - track.distance < Tracker.margin)
+        )
+
+    def assign(self, track, encoding, name, distance):
+        track.encoding = encoding
+        track.name = name
+        track.distance = distance
+        track.age = 0
+
+    def reset(self):
+        self.tracks = []